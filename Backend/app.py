@@ -1,11 +1,19 @@
 import os
 import json
+import time
+import threading
+import numpy as np
 import pandas as pd
 from flask import Flask, request, jsonify, session
-from flask import send_from_directory
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
-from utils import generate_sample
+from utils import generate_sample, build_features, scaler_input, PHASES
+from utils import MODELS_DIR, MODEL_ARTIFACTS, resolve_path
+from explain import explain_rows, explanation, format_top
+from fleet import FleetState
+from static_assets import AssetCache
+from rules import RuleEngine, make_batch
+from dataset import NUMERIC_FEATURES, HEALTH_CLASSES
 import joblib
 import smtplib
 from email.message import EmailMessage
@@ -21,14 +29,20 @@ CORS(app, supports_credentials=True)
 # Serve frontend files from the sibling Frontend folder so pages run on same origin
 FRONTEND_DIR = os.path.abspath(os.path.join(BASE_DIR, os.pardir, 'Frontend'))
 
+# Frontend files are held in memory with precompressed variants (see static_assets.py)
+ASSETS = AssetCache(FRONTEND_DIR, fallback="login.html")
+
 @app.route('/', defaults={'path': 'login.html'})
 @app.route('/<path:path>')
 def serve_frontend(path):
-    target = os.path.join(FRONTEND_DIR, path)
-    if os.path.exists(target) and os.path.isfile(target):
-        return send_from_directory(FRONTEND_DIR, path)
-    # fallback to login page for unknown paths (SPAs)
-    return send_from_directory(FRONTEND_DIR, 'login.html')
+    # unknown paths fall back to the login page (SPAs)
+    status, body, headers = ASSETS.respond(
+        path,
+        request.args.get("v"),
+        request.headers.get("Accept-Encoding"),
+        request.headers.get("If-None-Match"),
+    )
+    return app.response_class(body, status=status, headers=headers)
 
 # Load config or create default
 if os.path.exists(CONFIG_FILE):
@@ -46,10 +60,7 @@ else:
         },
         "MODEL": {
             "type": "rf",
-            "rf_path": "rf_engine_health_model.pkl",
-            "scaler_path": "scaler.pkl",
-            "label_encoder_path": "label_encoder.pkl",
-            "features_path": "model_features.pkl"
+            "reload_interval": 10
         }
     }
     with open(CONFIG_FILE, "w") as f:
@@ -61,46 +72,130 @@ app.secret_key = config.get("SECRET_KEY", os.urandom(24))
 ALLOW_ANON_PREDICT = config.get("ALLOW_ANON_PREDICT", False)
 
 # Load model and preprocessors if available
-MODEL = None
-SCALER = None
-LE = None
-MODEL_FEATURES = None
 MODEL_TYPE = config.get("MODEL", {}).get("type", "rf")
+MODEL_VERSION_FILE = os.path.join(MODELS_DIR, "model_version.json")
+INGEST_FILE = os.path.join(BASE_DIR, config.get("INGEST_FILE", "ingested_telemetry.csv"))
 
-try:
+# config keys that name a single artifact file. They predate MODEL.type and
+# always described the Random Forest, so they only apply to "rf".
+LEGACY_ARTIFACT_KEYS = {
+    "model": ("model_path", "rf_path"),
+    "scaler": ("scaler_path",),
+    "le": ("label_encoder_path",),
+    "features": ("features_path",),
+}
+
+
+def read_model_version():
+    try:
+        with open(MODEL_VERSION_FILE, "r") as f:
+            return json.load(f).get("version", "initial")
+    except Exception:
+        return "initial"
+
+
+def load_model_bundle():
+    """Load model, scaler, label encoder and feature list as one bundle.
+
+    Returns None when the files are missing. The bundle is swapped into
+    BUNDLE as a whole so a request never mixes artifacts of two versions.
+    """
     mconf = config.get("MODEL", {})
+    names = dict(MODEL_ARTIFACTS.get(MODEL_TYPE, MODEL_ARTIFACTS["rf"]))
     if MODEL_TYPE == "rf":
-        def resolve_path(p):
-            # try absolute / relative to BASE_DIR / savedmodels folder
-            if not p:
-                return None
-            if os.path.isabs(p) and os.path.exists(p):
-                return p
-            candidate = os.path.join(BASE_DIR, p)
-            if os.path.exists(candidate):
-                return candidate
-            # try savedmodels subfolder
-            candidate2 = os.path.join(BASE_DIR, "savedmodels", os.path.basename(p))
-            if os.path.exists(candidate2):
-                return candidate2
-            return None
-
-        rf_p = resolve_path(mconf.get("rf_path", "rf_engine_health_model.pkl"))
-        sc_p = resolve_path(mconf.get("scaler_path", "scaler.pkl"))
-        le_p = resolve_path(mconf.get("label_encoder_path", "label_encoder.pkl"))
-        ft_p = resolve_path(mconf.get("features_path", "model_features.pkl"))
-
-        if rf_p and sc_p and le_p and ft_p:
-            MODEL = joblib.load(rf_p)
-            SCALER = joblib.load(sc_p)
-            LE = joblib.load(le_p)
-            MODEL_FEATURES = joblib.load(ft_p)
-        else:
-            print("Model files not found. Looked for:", mconf)
+        for key, conf_keys in LEGACY_ARTIFACT_KEYS.items():
+            names[key] = next((mconf[k] for k in conf_keys if mconf.get(k)), names[key])
+    paths = {key: resolve_path(name) for key, name in names.items()}
+
+    if not all(paths.values()):
+        print("Model files not found. Looked for:", names)
+        return None
+
+    return {
+        "model": joblib.load(paths["model"]),
+        "scaler": joblib.load(paths["scaler"]),
+        "le": joblib.load(paths["le"]),
+        "features": joblib.load(paths["features"]),
+        "version": read_model_version(),
+    }
+
+
+BUNDLE = None
+try:
+    BUNDLE = load_model_bundle()
 except Exception as e:
     print("Model load warning:", e)
 
 
+def watch_model_version(interval):
+    """Reload the bundle whenever incremental.py publishes a new version."""
+    global BUNDLE
+    last = os.path.getmtime(MODEL_VERSION_FILE) if os.path.exists(MODEL_VERSION_FILE) else None
+    while True:
+        time.sleep(interval)
+        try:
+            if not os.path.exists(MODEL_VERSION_FILE):
+                continue
+            mtime = os.path.getmtime(MODEL_VERSION_FILE)
+            if mtime == last:
+                continue
+            bundle = load_model_bundle()
+            if bundle is not None:
+                BUNDLE = bundle
+                print("Model reloaded, version", bundle["version"])
+            last = mtime
+        except Exception as e:
+            print("Model reload warning:", e)
+
+
+def transform_frame(bundle, df):
+    """Scaled model input for a DataFrame of raw readings."""
+    scaler = bundle["scaler"]
+    return scaler.transform(scaler_input(scaler, build_features(df, bundle["features"])))
+
+
+def predict_frame(bundle, df, X=None):
+    """Run the bundle on a DataFrame of raw readings; returns (labels, proba)."""
+    if X is None:
+        X = transform_frame(bundle, df)
+    proba = bundle["model"].predict_proba(X)
+    labels = bundle["le"].inverse_transform(proba.argmax(axis=1))
+    return labels, proba
+
+
+def explain_frame(bundle, df):
+    """Predictions plus attributions for the predicted class of every row."""
+    X = transform_frame(bundle, df)
+    labels, proba = predict_frame(bundle, df, X)
+    phi, base = explain_rows(bundle, X)
+    classes = proba.argmax(axis=1)
+    explanations = [explanation(bundle, phi[i], base[i], classes[i]) for i in range(len(df))]
+    return labels, proba, explanations
+
+
+def proba_dict(bundle, proba_row):
+    return {cls: float(p) for cls, p in zip(bundle["le"].classes_, proba_row)}
+
+
+# Fleet-wide aggregates, updated on every prediction
+FLEET = FleetState(worst_k=config.get("FLEET_WORST_K", 10))
+
+
+# Alert rules from config.json "ALERT_RULES", hot-reloaded when the file changes
+RULES = RuleEngine(CONFIG_FILE)
+
+
+def evaluate_rules(bundle, df, labels, proba):
+    """Alerts raised by the configured rules for a batch of predictions."""
+    return RULES.evaluate(make_batch(df, labels, proba, bundle["le"].classes_))
+
+
+def record_fleet(bundle, readings, labels, proba):
+    """Feed predictions for a list of reading dicts into the fleet aggregates."""
+    for reading, label, p in zip(readings, labels, proba):
+        FLEET.record(reading.get("Aircraft_ID"), reading, str(label), proba_dict(bundle, p))
+
+
 def send_alert_email(to_email, subject, body):
     smtp = config.get("SMTP", {})
     host = smtp.get("HOST")
@@ -228,39 +323,39 @@ def sensor_latest():
     # run prediction if model available
     pred_label = None
     pred_proba = None
-    if MODEL is not None and SCALER is not None and LE is not None and MODEL_FEATURES is not None:
+    alerts = []
+    bundle = BUNDLE
+    if bundle is not None:
         try:
-            import pandas as pd
-            # build DataFrame row with model features
-            row = pd.DataFrame([sample])
-            # one-hot phase
-            row = pd.get_dummies(row, columns=["Phase"])
-            # align
-            for f in MODEL_FEATURES:
-                if f not in row.columns:
-                    row[f] = 0
-            row = row[MODEL_FEATURES]
-            X = SCALER.transform(row)
-            proba = MODEL.predict_proba(X)[0]
-            idx = int(proba.argmax())
-            pred_label = LE.inverse_transform([idx])[0]
-            pred_proba = {LE.inverse_transform([i])[0]: float(proba[i]) for i in range(len(proba))}
-
-            # if anomaly (not NORMAL) -> send alert
-            if pred_label != "NORMAL":
+            frame = pd.DataFrame([sample])
+            labels, proba = predict_frame(bundle, frame)
+            pred_label = labels[0]
+            pred_proba = proba_dict(bundle, proba[0])
+            record_fleet(bundle, [sample], labels, proba)
+            alerts = evaluate_rules(bundle, frame, labels, proba)
+
+            # if any alert rule fired -> send alert
+            if alerts:
                 users = read_users()
                 user = session.get("user")
                 rowu = users[users["username"] == user]
                 if not rowu.empty:
                     to_email = rowu.iloc[0].get("email")
+                    fired = ", ".join(f"{a['rule']} ({a['severity']})" for a in alerts)
                     subject = f"Engine Alert: {pred_label} detected"
-                    body = f"An anomaly was detected: {pred_label} with probabilities {pred_proba}\nSample: {sample}"
+                    body = (f"Alert rules fired: {fired}\n"
+                            f"Prediction: {pred_label} with probabilities {pred_proba}\nSample: {sample}")
+                    try:
+                        _, _, expls = explain_frame(bundle, frame)
+                        body += f"\nTop contributors ({expls[0]['space']}):\n{format_top(expls[0])}"
+                    except Exception as e:
+                        print("Explain error:", e)
                     send_alert_email(to_email, subject, body)
 
         except Exception as e:
             print("Prediction error:", e)
 
-    return jsonify({"sample": sample, "prediction": pred_label, "probabilities": pred_proba})
+    return jsonify({"sample": sample, "prediction": pred_label, "probabilities": pred_proba, "alerts": alerts})
 
 
 @app.route("/predict", methods=["POST"])
@@ -270,27 +365,186 @@ def predict():
     if not data:
         return jsonify({"error": "no data"}), 400
 
-    if MODEL is None:
+    bundle = BUNDLE
+    if bundle is None:
         return jsonify({"error": "model not loaded", "hint": "Place model files in Backend/savedmodels or update Backend/config.json MODEL paths."}), 500
 
     try:
-        import pandas as pd
-        row = pd.DataFrame([data])
-        row = pd.get_dummies(row, columns=["Phase"]) if "Phase" in row.columns else row
-        for f in MODEL_FEATURES:
-            if f not in row.columns:
-                row[f] = 0
-        row = row[MODEL_FEATURES]
-        X = SCALER.transform(row)
-        proba = MODEL.predict_proba(X)[0]
-        idx = int(proba.argmax())
-        pred_label = LE.inverse_transform([idx])[0]
-        pred_proba = {LE.inverse_transform([i])[0]: float(proba[i]) for i in range(len(proba))}
-        return jsonify({"prediction": pred_label, "probabilities": pred_proba})
+        frame = pd.DataFrame([data])
+        if request.args.get("explain") in ("1", "true"):
+            labels, proba, expls = explain_frame(bundle, frame)
+            record_fleet(bundle, [data], labels, proba)
+            return jsonify({"prediction": labels[0], "probabilities": proba_dict(bundle, proba[0]),
+                            "explanation": expls[0], "alerts": evaluate_rules(bundle, frame, labels, proba)})
+        labels, proba = predict_frame(bundle, frame)
+        record_fleet(bundle, [data], labels, proba)
+        return jsonify({"prediction": labels[0], "probabilities": proba_dict(bundle, proba[0]),
+                        "alerts": evaluate_rules(bundle, frame, labels, proba)})
     except Exception as e:
         print("Predict error:", e)
         return jsonify({"error": "prediction failed"}), 500
 
 
+# Upper bound on rows per /predict/batch request
+PREDICT_BATCH_LIMIT = config.get("PREDICT_BATCH_LIMIT", 20000)
+
+
+@app.route("/predict/batch", methods=["POST"])
+@login_required
+def predict_batch():
+    """Predict a list of readings and evaluate the alert rules in one pass."""
+    data = request.json
+    if not data or not isinstance(data, list):
+        return jsonify({"error": "expected a list of readings"}), 400
+    if len(data) > PREDICT_BATCH_LIMIT:
+        return jsonify({"error": "batch too large", "limit": PREDICT_BATCH_LIMIT}), 400
+
+    bundle = BUNDLE
+    if bundle is None:
+        return jsonify({"error": "model not loaded"}), 500
+
+    try:
+        frame = pd.DataFrame(data)
+        labels, proba = predict_frame(bundle, frame)
+        record_fleet(bundle, data, labels, proba)
+        alerts = evaluate_rules(bundle, frame, labels, proba)
+        return jsonify({
+            "model_version": bundle["version"],
+            "predictions": [str(l) for l in labels],
+            "probabilities": [proba_dict(bundle, p) for p in proba],
+            "alerts": alerts,
+        })
+    except Exception as e:
+        print("Batch predict error:", e)
+        return jsonify({"error": "prediction failed"}), 500
+
+
+@app.route("/alerts/rules", methods=["GET"])
+@login_required
+def alert_rules():
+    """Active rule set version and rule-evaluation throughput."""
+    return jsonify(RULES.stats())
+
+
+# Upper bound on rows per /explain/batch request
+EXPLAIN_BATCH_LIMIT = config.get("EXPLAIN_BATCH_LIMIT", 5000)
+
+
+@app.route("/explain/batch", methods=["POST"])
+@login_required
+def explain_batch():
+    """Predictions and attributions for a list of readings in one pass."""
+    data = request.json
+    if not data or not isinstance(data, list):
+        return jsonify({"error": "expected a list of readings"}), 400
+    if len(data) > EXPLAIN_BATCH_LIMIT:
+        return jsonify({"error": "batch too large", "limit": EXPLAIN_BATCH_LIMIT}), 400
+
+    bundle = BUNDLE
+    if bundle is None:
+        return jsonify({"error": "model not loaded"}), 500
+
+    try:
+        labels, proba, expls = explain_frame(bundle, pd.DataFrame(data))
+        record_fleet(bundle, data, labels, proba)
+        results = [
+            {"prediction": labels[i], "probabilities": proba_dict(bundle, proba[i]), "explanation": expls[i]}
+            for i in range(len(data))
+        ]
+        return jsonify({"model_version": bundle["version"], "results": results})
+    except Exception as e:
+        print("Explain error:", e)
+        return jsonify({"error": "explanation failed"}), 500
+
+
+@app.route("/fleet/summary", methods=["GET"])
+@login_required
+def fleet_summary():
+    """Fleet overview from the incrementally maintained aggregates.
+
+    Supports conditional GET: a matching If-None-Match gets a 304 without
+    building the snapshot.
+    """
+    etag = FLEET.etag()
+    if etag in request.headers.get("If-None-Match", ""):
+        resp = app.response_class(status=304)
+    else:
+        version, body = FLEET.summary_json()
+        resp = app.response_class(body, mimetype="application/json")
+        etag = FLEET.etag(version)
+    resp.headers["ETag"] = etag
+    # browsers revalidate every poll, which is the cheap 304 path
+    resp.headers["Cache-Control"] = "private, no-cache"
+    return resp
+
+
+# Columns a labeled reading must carry to be usable by incremental.py:
+# identity, every raw model input and the label
+INGEST_COLUMNS = ["Timestamp", "Aircraft_ID", "Engine_Model", "Phase"] + NUMERIC_FEATURES + ["Health"]
+INGEST_LOCK = threading.Lock()
+
+
+def ingest_header_matches():
+    with open(INGEST_FILE, "r") as f:
+        return f.readline().strip().split(",") == INGEST_COLUMNS
+
+
+def invalid_ingest_rows(rows):
+    """Coerce sensors to numbers in place; return the rows incremental.py could not use."""
+    bad = pd.DataFrame(False, index=rows.index, columns=INGEST_COLUMNS)
+    for col in NUMERIC_FEATURES:
+        rows[col] = pd.to_numeric(rows[col], errors="coerce")
+        bad[col] = ~np.isfinite(rows[col].to_numpy(dtype=float))
+    for col in ["Timestamp", "Aircraft_ID", "Engine_Model"]:
+        bad[col] = rows[col].isna() | (rows[col].astype(str).str.strip() == "")
+    # an unknown label or phase would make every later incremental.py run fail on this row
+    bad["Phase"] = ~rows["Phase"].isin(PHASES)
+    bad["Health"] = ~rows["Health"].isin(HEALTH_CLASSES)
+    return [
+        {"row": int(i), "fields": [c for c in INGEST_COLUMNS if flags[c]]}
+        for i, flags in bad[bad.any(axis=1)].iterrows()
+    ]
+
+
+@app.route("/ingest", methods=["POST"])
+@login_required
+def ingest():
+    """Append labeled readings (one object or a list) for incremental training."""
+    data = request.json
+    if not data:
+        return jsonify({"error": "no data"}), 400
+    rows = pd.DataFrame(data if isinstance(data, list) else [data])
+
+    missing = [c for c in INGEST_COLUMNS if c not in rows.columns]
+    if missing:
+        return jsonify({"error": "missing fields", "fields": missing}), 400
+
+    rows = rows[INGEST_COLUMNS].copy()
+    invalid = invalid_ingest_rows(rows)
+    if invalid:
+        return jsonify({"error": "invalid rows", "rows": invalid}), 400
+
+    with INGEST_LOCK:
+        if os.path.exists(INGEST_FILE) and not ingest_header_matches():
+            # written with other columns (e.g. before Flight_Hours was required):
+            # move it and its incremental.py offset aside instead of mixing layouts
+            suffix = time.strftime(".%Y%m%d%H%M%S.old")
+            for path in (INGEST_FILE, INGEST_FILE + ".offset"):
+                if os.path.exists(path):
+                    os.replace(path, path + suffix)
+        header = not os.path.exists(INGEST_FILE)
+        rows.to_csv(INGEST_FILE, mode="a", header=header, index=False)
+    return jsonify({"status": "ok", "rows": len(rows)})
+
+
 if __name__ == "__main__":
+    reload_interval = config.get("MODEL", {}).get("reload_interval", 10)
+    if reload_interval:
+        threading.Thread(target=watch_model_version, args=(reload_interval,), daemon=True).start()
+    rules_interval = config.get("RULES_RELOAD_INTERVAL", 2)
+    if rules_interval:
+        threading.Thread(target=RULES.watch, args=(rules_interval,), daemon=True).start()
+    static_interval = config.get("STATIC_RELOAD_INTERVAL", 2)
+    if static_interval:
+        threading.Thread(target=ASSETS.watch, args=(static_interval,), daemon=True).start()
     app.run(host="0.0.0.0", port=5000, debug=True)
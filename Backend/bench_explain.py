@@ -0,0 +1,74 @@
+"""Benchmark the per-row cost of explain.explain_rows.
+
+Loads the configured model bundle the same way the API does and times
+predict_proba alone vs. predict_proba + attributions for several batch sizes
+of hold-out readings. Also checks that base + sum(phi) reproduces the model
+output (exact for the Random Forest, margin space for XGBoost).
+
+Usage:
+    python bench_explain.py --sizes 1 10 100 1000 --repeats 20
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from app import BUNDLE, BASE_DIR, transform_frame
+from explain import get_explainer, explain_rows
+from utils import TEST_AIRCRAFT
+
+DATASET_FILE = os.path.join(BASE_DIR, "adour_engine_stable_ml_dataset.csv")
+
+
+def timed(fn, repeats):
+    fn()  # warm-up (also builds the cached explainer)
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Explanation latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if BUNDLE is None:
+        print("Model not loaded; check Backend/config.json MODEL paths")
+        return 1
+
+    df = pd.read_csv(DATASET_FILE)
+    df = df[df["Aircraft_ID"].isin(TEST_AIRCRAFT)]
+    X_all = transform_frame(BUNDLE, df)
+    model = BUNDLE["model"]
+
+    t0 = time.perf_counter()
+    explainer = get_explainer(BUNDLE)
+    print(f"explainer build: {(time.perf_counter() - t0) * 1000:.1f} ms (once per model version)")
+    if "max_path_nonzeros" in explainer:
+        print(f"per-row bound: {explainer['max_path_nonzeros']} path nodes")
+
+    # additivity check on a few rows
+    phi, base = explain_rows(BUNDLE, X_all[:50])
+    if explainer["space"] == "probability":
+        err = np.abs(base + phi.sum(axis=1) - model.predict_proba(X_all[:50])).max()
+        print(f"max |base + sum(phi) - predict_proba| = {err:.2e}")
+
+    print(f"\n{'rows':>6} {'predict us/row':>15} {'+explain us/row':>16} {'overhead':>9}")
+    for n in args.sizes:
+        X = np.resize(X_all, (n, X_all.shape[1]))
+        t_pred = timed(lambda: model.predict_proba(X), args.repeats)
+        t_expl = timed(lambda: (model.predict_proba(X), explain_rows(BUNDLE, X)), args.repeats)
+        print(f"{n:>6} {t_pred / n * 1e6:>15.1f} {t_expl / n * 1e6:>16.1f} {t_expl / t_pred:>8.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
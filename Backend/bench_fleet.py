@@ -0,0 +1,101 @@
+"""Benchmark the fleet aggregates at fleet scale.
+
+Feeds --events predictions spread over --aircraft aircraft into FleetState
+and reports the cost per event, the cost of building and serializing a
+snapshot, the cost of the 304 path (ETag comparison only), and the
+per-event latency of record() while another thread keeps rebuilding
+snapshots (every event changes the version, as under load).
+
+Usage:
+    python bench_fleet.py --aircraft 10000 --events 200000
+"""
+
+import sys
+import time
+import argparse
+import threading
+
+import numpy as np
+
+from fleet import FleetState, HEALTH_STATES, SENSORS
+from utils import PHASES, PHASE_WEIGHTS
+
+
+def make_events(n_aircraft, n_events, seed=42):
+    rng = np.random.default_rng(seed)
+    aircraft = [f"AC-{i:05d}" for i in range(n_aircraft)]
+    ids = rng.integers(0, n_aircraft, n_events)
+    phases = rng.choice(PHASES, n_events, p=PHASE_WEIGHTS)
+    labels = rng.choice(HEALTH_STATES, n_events, p=[0.80, 0.15, 0.05])
+    values = rng.uniform(0, 1000, (n_events, len(SENSORS)))
+    probas = rng.dirichlet([1, 1, 1], n_events)
+
+    events = []
+    for i in range(n_events):
+        reading = dict(zip(SENSORS, values[i].tolist()), Phase=str(phases[i]))
+        proba = dict(zip(HEALTH_STATES, probas[i].tolist()))
+        events.append((aircraft[ids[i]], reading, str(labels[i]), proba))
+    return events
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fleet summary benchmark")
+    parser.add_argument("--aircraft", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    events = make_events(args.aircraft, args.events)
+    fleet = FleetState()
+
+    t0 = time.perf_counter()
+    for ac, reading, label, proba in events:
+        fleet.record(ac, reading, label, proba)
+    t_record = time.perf_counter() - t0
+
+    snap_times = []
+    for ac, reading, label, proba in events[:args.repeats]:
+        fleet.record(ac, reading, label, proba)
+        t0 = time.perf_counter()
+        _, body = fleet.summary_json()
+        snap_times.append(time.perf_counter() - t0)
+
+    # record() latency while a dashboard poller rebuilds on every version
+    stop = threading.Event()
+    polls = [0]
+
+    def poll():
+        while not stop.is_set():
+            fleet.summary_json()
+            polls[0] += 1
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    record_times = []
+    for ac, reading, label, proba in events[:args.repeats * 1000]:
+        t0 = time.perf_counter()
+        fleet.record(ac, reading, label, proba)
+        record_times.append(time.perf_counter() - t0)
+    stop.set()
+    poller.join()
+    record_us = np.asarray(record_times) * 1e6
+
+    etag = fleet.etag()
+    t0 = time.perf_counter()
+    for _ in range(100000):
+        fleet.etag() == etag
+    t_etag = (time.perf_counter() - t0) / 100000
+
+    print(f"aircraft tracked : {len(fleet.latest)}")
+    print(f"record           : {t_record / args.events * 1e6:.2f} us/event "
+          f"({args.events / t_record:,.0f} events/s)")
+    print(f"snapshot rebuild : {np.median(snap_times) * 1000:.2f} ms ({len(body) / 1024:.0f} KiB JSON)")
+    print(f"304 check        : {t_etag * 1e6:.2f} us")
+    print(f"record + polling : p50 {np.percentile(record_us, 50):.1f} us, "
+          f"p99 {np.percentile(record_us, 99):.1f} us, max {record_us.max() / 1000:.2f} ms "
+          f"({polls[0]} polls)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Benchmark alert rule evaluation throughput.
+
+Builds batches of synthetic readings (utils.generate_sample) over a fleet of
+--aircraft aircraft with random model outputs and evaluates the rules from
+config.json on them, reporting rows per second for each batch size.
+
+Usage:
+    python bench_rules.py --sizes 100 1000 10000 --aircraft 500
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from rules import RuleEngine, make_batch
+from utils import generate_sample
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(BASE_DIR, "config.json")
+CLASSES = ["CRITICAL", "NORMAL", "WARNING"]
+
+
+def synthetic_batch(rows, n_aircraft, rng):
+    df = pd.DataFrame([generate_sample(aircraft_id=f"AC-{i % n_aircraft:05d}") for i in range(rows)])
+    proba = rng.dirichlet([1, 3, 2], rows)
+    labels = np.asarray(CLASSES)[proba.argmax(axis=1)]
+    return make_batch(df, labels, proba, CLASSES)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rule evaluation throughput")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--aircraft", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    engine = RuleEngine(CONFIG_FILE)
+    rng = np.random.default_rng(42)
+    print(f"{len(engine.rules)} rules: {', '.join(r['name'] for r in engine.rules)}")
+    print(f"\n{'rows':>7} {'ms/batch':>9} {'rows/s':>12} {'alerts':>7}")
+
+    for n in args.sizes:
+        batch = synthetic_batch(n, args.aircraft, rng)
+        alerts = engine.evaluate(batch)  # warm-up
+        times = []
+        for _ in range(args.repeats):
+            t0 = time.perf_counter()
+            engine.evaluate(batch)
+            times.append(time.perf_counter() - t0)
+        t = float(np.median(times))
+        print(f"{n:>7} {t * 1000:>9.2f} {n / t:>12,.0f} {len(alerts):>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
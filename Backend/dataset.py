@@ -0,0 +1,171 @@
+"""Memory-compact loading of the engine telemetry dataset.
+
+pandas defaults load every sensor as float64, the labels as Python-object
+strings and Timestamp as a string, and the training scripts then copy the
+frame several times (copy, drop, get_dummies, align, fit_transform). Here:
+
+  * sensors are float32, Phase / Health / Aircraft_ID / Engine_Model are
+    categoricals backed by int8 codes (wider for fleets of 128+ aircraft),
+    Timestamp is int64 epoch nanoseconds,
+  * the typed columns are cached next to the CSV as one .npy file per column
+    (rows sorted by aircraft) and opened with np.load(mmap_mode="r"),
+  * feature_matrix() fills one preallocated float32 matrix straight from the
+    columns (one-hot Phase from the codes), so the only full-size allocation
+    is the model input itself, which StandardScaler(copy=False) scales in place,
+  * aircraft_rows() returns a slice when an aircraft set is contiguous, so the
+    aircraft-wise split is a view instead of a copy.
+
+Usage:
+    df = load_dataset("adour_engine_stable_ml_dataset.csv")
+    rows = aircraft_rows(df, TRAIN_AIRCRAFT)
+    X = feature_matrix(df, rows)
+    y = label_codes(df, rows)
+"""
+
+import os
+import json
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from utils import PHASES
+
+# ================= SCHEMA =================
+SENSOR_COLS = ["Flight_Hours", "Throttle", "RPM", "FuelFlow", "EGT",
+               "OilTemp", "OilPressure", "Vibration", "Severity"]
+
+# Model inputs in the order the training scripts have always produced them:
+# numeric columns first, then the get_dummies Phase columns (sorted by name)
+NUMERIC_FEATURES = ["Flight_Hours", "Throttle", "RPM", "FuelFlow", "EGT",
+                    "OilTemp", "OilPressure", "Vibration"]
+PHASE_FEATURES = [f"Phase_{p}" for p in sorted(PHASES)]
+MODEL_FEATURES = NUMERIC_FEATURES + PHASE_FEATURES
+
+# Health categories are sorted so the codes equal LabelEncoder's encoding
+HEALTH_CLASSES = sorted(["NORMAL", "WARNING", "CRITICAL"])
+
+CATEGORIES = {
+    "Phase": PHASES,
+    "Health": HEALTH_CLASSES,
+}
+CATEGORICAL_COLS = ["Aircraft_ID", "Engine_Model", "Phase", "Health"]
+
+CSV_DTYPES = {c: np.float32 for c in SENSOR_COLS}
+CSV_DTYPES.update({c: "category" for c in CATEGORICAL_COLS})
+
+CACHE_META = "meta.json"
+
+
+def cache_dir_for(csv_path):
+    return os.path.splitext(csv_path)[0] + ".cache"
+
+
+# ================= CSV -> CACHE =================
+def read_csv_typed(csv_path):
+    """Read the CSV directly into the compact dtypes."""
+    df = pd.read_csv(csv_path, dtype=CSV_DTYPES)
+    for col, cats in CATEGORIES.items():
+        if col in df.columns:
+            df[col] = df[col].cat.set_categories(cats)
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return df
+
+
+def write_cache(df, cache_dir):
+    """Store every column as a .npy file, rows sorted by aircraft then time."""
+    os.makedirs(cache_dir, exist_ok=True)
+    order = np.lexsort((df["Timestamp"].to_numpy(), df["Aircraft_ID"].cat.codes.to_numpy()))
+
+    meta = {"rows": int(len(df)), "columns": {}}
+    for col in df.columns:
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            cats = [str(c) for c in s.cat.categories]
+            # pandas already picks the narrowest code dtype (int8, int16, int32, ...)
+            arr = s.cat.codes.to_numpy()[order]
+            meta["columns"][col] = {"kind": "category", "categories": cats}
+        else:
+            arr = s.to_numpy()[order]
+            meta["columns"][col] = {"kind": "numeric"}
+        np.save(os.path.join(cache_dir, f"{col}.npy"), arr)
+
+    # meta is written last: its presence marks a complete cache
+    with open(os.path.join(cache_dir, CACHE_META), "w") as f:
+        json.dump(meta, f, indent=2)
+
+
+def read_cache(cache_dir):
+    """Open the cached columns memory-mapped; nothing is read until used."""
+    with open(os.path.join(cache_dir, CACHE_META), "r") as f:
+        meta = json.load(f)
+
+    columns = {}
+    for col, info in meta["columns"].items():
+        arr = np.load(os.path.join(cache_dir, f"{col}.npy"), mmap_mode="r")
+        if info["kind"] == "category":
+            columns[col] = pd.Categorical.from_codes(arr, categories=info["categories"])
+        else:
+            columns[col] = arr
+    return pd.DataFrame(columns, copy=False)
+
+
+def cache_is_fresh(csv_path, cache_dir):
+    meta = os.path.join(cache_dir, CACHE_META)
+    return os.path.exists(meta) and os.path.getmtime(meta) >= os.path.getmtime(csv_path)
+
+
+def load_dataset(csv_path, cache_dir=None, rebuild=False):
+    """Load the dataset with compact dtypes, building the binary cache if needed."""
+    cache_dir = cache_dir or cache_dir_for(csv_path)
+    if rebuild or not cache_is_fresh(csv_path, cache_dir):
+        write_cache(read_csv_typed(csv_path), cache_dir)
+    return read_cache(cache_dir)
+
+
+# ================= PREPROCESSING =================
+def aircraft_rows(df, aircraft_ids):
+    """Row selector for the given aircraft: a slice if contiguous, else indices."""
+    col = df["Aircraft_ID"]
+    wanted = [col.cat.categories.get_loc(a) for a in aircraft_ids if a in col.cat.categories]
+    idx = np.flatnonzero(np.isin(col.cat.codes.to_numpy(), wanted))
+    if idx.size == 0:
+        return slice(0, 0)
+    if idx[-1] - idx[0] + 1 == idx.size:
+        return slice(int(idx[0]), int(idx[-1]) + 1)
+    return idx
+
+
+def feature_matrix(df, rows=slice(None), features=MODEL_FEATURES):
+    """Build the float32 model input for the selected rows in one allocation."""
+    if isinstance(rows, slice):
+        n = len(range(*rows.indices(len(df))))
+    else:
+        n = len(rows)
+    X = np.empty((n, len(features)), dtype=np.float32)
+
+    phase_codes = None
+    phase_cats = None
+    for j, f in enumerate(features):
+        if f.startswith("Phase_"):
+            if phase_codes is None:
+                phase_codes = df["Phase"].cat.codes.to_numpy()[rows]
+                phase_cats = list(df["Phase"].cat.categories)
+            name = f[len("Phase_"):]
+            if name in phase_cats:
+                np.equal(phase_codes, phase_cats.index(name), out=X[:, j], casting="unsafe")
+            else:
+                X[:, j] = 0
+        else:
+            X[:, j] = df[f].to_numpy()[rows]
+    return X
+
+
+def label_codes(df, rows=slice(None)):
+    """Health as int8 codes, identical to LabelEncoder().fit_transform."""
+    return df["Health"].cat.codes.to_numpy()[rows]
+
+
+def label_encoder():
+    """A fitted LabelEncoder matching label_codes, for the saved artifacts."""
+    return LabelEncoder().fit(HEALTH_CLASSES)
@@ -0,0 +1,149 @@
+"""Per-prediction feature attributions for the tree models.
+
+Random Forest: path attributions (Saabas / tree-interpreter style, the
+path-dependent approximation of TreeSHAP). Every node of every tree gets the
+change in class probability it causes, charged to the feature its parent
+split on. Those per-node vectors are precomputed once into one sparse
+matrix M (all nodes of all trees x features*classes), so a batch is explained
+with one decision_path call and one sparse product:
+
+    phi = decision_path(X) @ M / n_trees
+
+For each row, base value + sum of phi equals predict_proba exactly, and the
+cost per row is bounded by n_trees * (max_depth + 1) non-zeros.
+
+XGBoost: the booster's native TreeSHAP (pred_contribs=True), reported in
+margin (log-odds) space.
+
+The precomputed matrix is cached per model version, so it is rebuilt only
+when a new model is published.
+"""
+
+import threading
+
+import numpy as np
+from scipy import sparse
+
+# Model version -> explainer; only the current versions are kept
+_EXPLAINERS = {}
+_EXPLAINERS_LOCK = threading.Lock()
+MAX_CACHED_VERSIONS = 2
+
+
+# ================= RANDOM FOREST =================
+def build_forest_explainer(rf, n_features):
+    n_classes = len(rf.classes_)
+    rows, cols, data = [], [], []
+    bias = np.zeros(n_classes)
+    offset = 0
+    max_depth = 0
+
+    for est in rf.estimators_:
+        tree = est.tree_
+        value = tree.value[:, 0, :]
+        value = value / value.sum(axis=1, keepdims=True)
+        bias += value[0]
+        max_depth = max(max_depth, tree.max_depth)
+
+        parents = np.flatnonzero(tree.children_left != -1)
+        for children in (tree.children_left[parents], tree.children_right[parents]):
+            delta = value[children] - value[parents]
+            feat = tree.feature[parents]
+            rows.append(np.repeat(offset + children, n_classes))
+            cols.append((feat[:, None] * n_classes + np.arange(n_classes)).ravel())
+            data.append(delta.ravel())
+        offset += tree.node_count
+
+    n_trees = len(rf.estimators_)
+    matrix = sparse.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(offset, n_features * n_classes),
+    )
+    return {
+        "kind": "rf",
+        "matrix": matrix / n_trees,
+        "bias": bias / n_trees,
+        "n_classes": n_classes,
+        "n_features": n_features,
+        "space": "probability",
+        "max_path_nonzeros": n_trees * (max_depth + 1),
+    }
+
+
+def explain_forest(explainer, rf, X):
+    indicator, _ = rf.decision_path(X)
+    phi = (indicator @ explainer["matrix"]).toarray()
+    base = np.broadcast_to(explainer["bias"], (len(X), explainer["n_classes"]))
+    return phi.reshape(len(X), explainer["n_features"], explainer["n_classes"]), base
+
+
+# ================= XGBOOST =================
+def explain_booster(explainer, xgb, X):
+    from xgboost import DMatrix
+
+    contribs = xgb.get_booster().predict(DMatrix(X), pred_contribs=True)
+    # (rows, classes, features + 1) -> (rows, features, classes) and bias
+    return np.transpose(contribs[:, :, :-1], (0, 2, 1)), contribs[:, :, -1]
+
+
+# ================= PUBLIC API =================
+def get_explainer(bundle):
+    """Return the explainer for this bundle, building it once per model version."""
+    key = (bundle["version"], id(bundle["model"]))
+    explainer = _EXPLAINERS.get(key)
+    if explainer is not None:
+        return explainer
+
+    with _EXPLAINERS_LOCK:
+        explainer = _EXPLAINERS.get(key)
+        if explainer is None:
+            model = bundle["model"]
+            if hasattr(model, "estimators_"):
+                explainer = build_forest_explainer(model, len(bundle["features"]))
+            elif hasattr(model, "get_booster"):
+                explainer = {"kind": "xgb", "space": "log-odds"}
+            else:
+                raise ValueError(f"no explainer for model type {type(model).__name__}")
+            while len(_EXPLAINERS) >= MAX_CACHED_VERSIONS:
+                _EXPLAINERS.pop(next(iter(_EXPLAINERS)))
+            _EXPLAINERS[key] = explainer
+    return explainer
+
+
+def explain_rows(bundle, X):
+    """Attributions for scaled inputs X.
+
+    Returns (phi, base): phi has shape (rows, features, classes), base has
+    shape (rows, classes); base + phi.sum(axis=1) is the model output.
+    """
+    explainer = get_explainer(bundle)
+    if explainer["kind"] == "rf":
+        return explain_forest(explainer, bundle["model"], X)
+    return explain_booster(explainer, bundle["model"], X)
+
+
+def group_features(features, phi_row):
+    """Sum the Phase_* one-hot columns into a single "Phase" contribution."""
+    grouped = {}
+    for name, value in zip(features, phi_row):
+        key = "Phase" if name.startswith("Phase_") else name
+        grouped[key] = grouped.get(key, 0.0) + float(value)
+    return grouped
+
+
+def explanation(bundle, phi_row, base_row, class_idx, top_k=3):
+    """JSON-friendly explanation of one row for the given class."""
+    contributions = group_features(bundle["features"], phi_row[:, class_idx])
+    top = sorted(contributions.items(), key=lambda kv: abs(kv[1]), reverse=True)[:top_k]
+    return {
+        "class": str(bundle["le"].classes_[class_idx]),
+        "space": get_explainer(bundle)["space"],
+        "base_value": round(float(base_row[class_idx]), 6),
+        "contributions": {k: round(v, 6) for k, v in contributions.items()},
+        "top": [{"feature": k, "contribution": round(v, 6)} for k, v in top],
+    }
+
+
+def format_top(expl):
+    """One line per top contributor, for alert emails."""
+    return "\n".join(f"  {t['feature']}: {t['contribution']:+.4f}" for t in expl["top"])
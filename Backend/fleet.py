@@ -0,0 +1,188 @@
+"""Incrementally maintained fleet aggregates for /fleet/summary.
+
+Every prediction calls FleetState.record() with the reading and the model
+output. The state keeps only each aircraft's latest reading and updates the
+aggregates per event by removing the aircraft's previous contribution and
+adding the new one:
+
+  * number of aircraft per health state,
+  * per-phase sensor averages over the fleet's latest readings,
+  * time of the last non-NORMAL prediction per aircraft,
+  * a risk score per aircraft (P(CRITICAL) + 0.5 * P(WARNING)), kept in a
+    heap ordered by risk. A new reading pushes a new entry (O(log aircraft))
+    and leaves the aircraft's previous one behind as stale; stale entries are
+    dropped when they reach the top, and the heap is compacted once they
+    outnumber the live ones, so the worst engines are its first worst_k live
+    entries.
+
+Every event bumps a version counter. summary() builds the JSON snapshot at
+most once per version and etag() is derived from the version, so a dashboard
+that revalidates with If-None-Match gets a 304 without any work while nothing
+has changed. A rebuild holds the lock that record() takes only to copy the
+state; everything else happens outside it. The per-aircraft anomaly times
+are serialized once, when they change, so a rebuild only joins them.
+"""
+
+import os
+import re
+import json
+import time
+import heapq
+import threading
+
+from utils import PHASES
+
+HEALTH_STATES = ["NORMAL", "WARNING", "CRITICAL"]
+SENSORS = ["Throttle", "RPM", "FuelFlow", "EGT", "OilTemp", "OilPressure", "Vibration"]
+# IDs end up in the dashboard; anything else is not recorded
+AIRCRAFT_ID = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+
+
+def risk_score(proba):
+    return proba.get("CRITICAL", 0.0) + 0.5 * proba.get("WARNING", 0.0)
+
+
+class FleetState:
+    def __init__(self, worst_k=10):
+        self.worst_k = worst_k
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()  # one snapshot rebuild at a time
+        # random per-process prefix so ETags from an earlier run never match
+        self.epoch = os.urandom(4).hex()
+        self.version = 0
+        self.updated_at = None
+
+        self.latest = {}         # aircraft -> (health, phase, sensor values, risk)
+        self.last_anomaly = {}   # aircraft -> epoch seconds
+        self.anomaly_json = {}   # aircraft -> '"<aircraft>": <seconds>'
+        self.health_counts = {h: 0 for h in HEALTH_STATES}
+        self.phase_counts = {p: 0 for p in PHASES}
+        self.phase_sums = {p: [0.0] * len(SENSORS) for p in PHASES}
+        self.risk_heap = []      # (-risk, aircraft, seq); older seqs are stale
+        self.risk_seq = {}       # aircraft -> seq of its live heap entry
+
+        # (version, snapshot, serialized snapshot), replaced as one object
+        self._built = (-1, None, None)
+
+    # ---------------- updates ----------------
+    def _apply(self, entry, sign):
+        health, phase, values, _ = entry
+        if health in self.health_counts:
+            self.health_counts[health] += sign
+        if phase in self.phase_counts:
+            self.phase_counts[phase] += sign
+            sums = self.phase_sums[phase]
+            for i, v in enumerate(values):
+                sums[i] += sign * v
+
+    def record(self, aircraft_id, reading, label, proba, when=None):
+        """Fold one prediction into the aggregates (amortized O(log aircraft)).
+
+        Readings with a malformed Aircraft_ID or an unknown Phase are skipped.
+        """
+        if not isinstance(aircraft_id, str) or not AIRCRAFT_ID.fullmatch(aircraft_id):
+            return
+        if reading.get("Phase") is not None and reading.get("Phase") not in PHASES:
+            return
+        if label not in HEALTH_STATES:
+            return
+        when = time.time() if when is None else when
+        values = [float(reading.get(s, 0.0) or 0.0) for s in SENSORS]
+        entry = (label, reading.get("Phase"), values, risk_score(proba))
+
+        with self.lock:
+            old = self.latest.get(aircraft_id)
+            if old is not None:
+                self._apply(old, -1)
+            self._apply(entry, +1)
+            self.latest[aircraft_id] = entry
+            self._push_risk(aircraft_id, entry[3], self.version + 1)
+            if label != "NORMAL":
+                self.last_anomaly[aircraft_id] = when
+                self.anomaly_json[aircraft_id] = f"{json.dumps(aircraft_id)}: {json.dumps(when)}"
+            self.version += 1
+            self.updated_at = when
+
+    def _push_risk(self, aircraft_id, risk, seq):
+        heapq.heappush(self.risk_heap, (-risk, aircraft_id, seq))
+        self.risk_seq[aircraft_id] = seq
+        if len(self.risk_heap) > 2 * len(self.risk_seq) + self.worst_k:
+            # O(heap) but only after as many pushes, so O(1) per record()
+            self.risk_heap = [e for e in self.risk_heap if self.risk_seq[e[1]] == e[2]]
+            heapq.heapify(self.risk_heap)
+
+    def _worst(self):
+        """The worst_k aircraft by risk, highest first; caller holds the lock."""
+        top = []
+        while self.risk_heap and len(top) < self.worst_k:
+            e = heapq.heappop(self.risk_heap)
+            # stale entries are discarded for good, live ones go back
+            if self.risk_seq[e[1]] == e[2]:
+                top.append(e)
+        for e in top:
+            heapq.heappush(self.risk_heap, e)
+        return [e[1] for e in top]
+
+    # ---------------- reads ----------------
+    def etag(self, version=None):
+        version = self.version if version is None else version
+        return f'"fleet-{self.epoch}-{version}"'
+
+    def _current(self):
+        """(version, snapshot, json) for the current version, rebuilt if stale."""
+        built = self._built
+        if built[0] == self.version:
+            return built
+
+        with self.build_lock:
+            # copy what the snapshot needs; record() waits only for this part
+            with self.lock:
+                built = self._built
+                if built[0] == self.version:
+                    return built
+                version = self.version
+                updated_at = self.updated_at
+                n_aircraft = len(self.latest)
+                health_counts = dict(self.health_counts)
+                phase_counts = dict(self.phase_counts)
+                phase_sums = {p: list(v) for p, v in self.phase_sums.items()}
+                worst = [(ac, self.latest[ac]) for ac in self._worst()]
+                last_anomaly = dict(self.last_anomaly)
+                anomaly_json = list(self.anomaly_json.values())
+
+            phase_averages = {}
+            for p in PHASES:
+                n = phase_counts[p]
+                if n:
+                    phase_averages[p] = {s: round(v / n, 3) for s, v in zip(SENSORS, phase_sums[p])}
+
+            snapshot = {
+                "version": version,
+                "updated_at": updated_at,
+                "aircraft": n_aircraft,
+                "health_counts": health_counts,
+                "phase_counts": {p: n for p, n in phase_counts.items() if n},
+                "phase_averages": phase_averages,
+                "worst_engines": [
+                    {"aircraft_id": ac, "health": e[0], "phase": e[1], "risk": round(e[3], 4),
+                     "last_anomaly_at": last_anomaly.get(ac)}
+                    for ac, e in worst
+                ],
+                # absolute times keep the snapshot (and its ETag) stable;
+                # clients subtract from their clock for "time since"
+                "last_anomaly_at": last_anomaly,
+            }
+            head = {k: v for k, v in snapshot.items() if k != "last_anomaly_at"}
+            body = f'{json.dumps(head)[:-1]}, "last_anomaly_at": {{{", ".join(anomaly_json)}}}}}'
+            built = (version, snapshot, body)
+            self._built = built
+            return built
+
+    def summary(self):
+        """JSON-ready snapshot; rebuilt only when the version has changed."""
+        return self._current()[1]
+
+    def summary_json(self):
+        """(version, serialized snapshot); serialized once per version."""
+        version, _, body = self._current()
+        return version, body
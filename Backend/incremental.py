@@ -0,0 +1,350 @@
+"""Incremental model updates from newly ingested labeled telemetry.
+
+Instead of re-running randomforest.py / xgboost_model.py over the whole CSV,
+this script takes only the new labeled rows and:
+
+  * updates the StandardScaler statistics with partial_fit,
+  * re-expresses the split thresholds of the existing trees in the updated
+    scaling (so old trees still split on the same raw sensor values; checked
+    on the hold-out before publishing),
+  * grows the Random Forest with new trees, or continues boosting the saved
+    XGBoost model, trained on the new rows only,
+  * validates the candidate on the aircraft-wise hold-out and publishes it
+    only if it does not score worse than the current model.
+
+Publishing replaces the artifacts where the app loads them from
+(utils.artifact_path) and then bumps savedmodels/model_version.json; the running Flask app watches that file and
+swaps the new model in without a restart.
+
+Only rows appended since the last publish are used: after publishing, the
+byte offset reached in the new-data CSV is stored next to it in
+"<file>.offset", and the next run starts from there. Delete that file to
+train on the whole CSV again.
+
+Usage:
+    python incremental.py ingested_telemetry.csv --model rf --trees 50
+    python incremental.py new_rows.csv --model xgb --rounds 50 --dry-run
+"""
+
+# ===================== IMPORTS =====================
+import io
+import os
+import sys
+import json
+import copy
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import joblib
+
+from sklearn.metrics import f1_score
+
+from utils import TEST_AIRCRAFT, build_features, is_test_aircraft, scaler_input
+from utils import BASE_DIR, MODELS_DIR, MODEL_ARTIFACTS, artifact_path
+
+DATASET_FILE = os.path.join(BASE_DIR, "adour_engine_stable_ml_dataset.csv")
+VERSION_FILE = os.path.join(MODELS_DIR, "model_version.json")
+
+# ===================== LOAD / SAVE =====================
+def load_artifacts(kind):
+    # same lookup as app.py, so the files updated are the ones being served
+    return {k: joblib.load(artifact_path(v)) for k, v in MODEL_ARTIFACTS[kind].items()}
+
+
+def publish_artifacts(kind, bundle, report):
+    """Write the new artifacts atomically, then bump the version file.
+
+    Every file is written to a temporary name and moved into place with
+    os.replace. The version file is written last, so a watcher that reacts to
+    it always sees a complete set of artifacts.
+    """
+    for key, name in MODEL_ARTIFACTS[kind].items():
+        final = artifact_path(name)
+        tmp = final + ".tmp"
+        joblib.dump(bundle[key], tmp)
+        os.replace(tmp, final)
+
+    version = {
+        "version": datetime.now().strftime("%Y%m%d%H%M%S%f"),
+        "type": kind,
+        "published_at": datetime.now().isoformat(),
+        "report": report,
+    }
+    tmp = VERSION_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(version, f, indent=2)
+    os.replace(tmp, VERSION_FILE)
+    return version
+
+
+# ===================== NEW ROWS =====================
+def offset_file(path):
+    return path + ".offset"
+
+
+def read_new_rows(path):
+    """Rows of the CSV at path appended since the last publish.
+
+    Returns (rows, end) where end is the byte offset after the last complete
+    line read; pass it to mark_used once the rows have been published.
+    """
+    offset = 0
+    if os.path.exists(offset_file(path)):
+        with open(offset_file(path), "r") as f:
+            offset = json.load(f)["offset"]
+    size = os.path.getsize(path)
+    if offset > size:
+        # the file was rotated or truncated since
+        offset = 0
+
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = max(offset, f.tell())
+        f.seek(start)
+        body = f.read(size - start)
+    # the app may be appending right now; stop at the last complete line
+    body = body[:body.rfind(b"\n") + 1]
+    return pd.read_csv(io.BytesIO(header + body)), start + len(body)
+
+
+def mark_used(path, end):
+    """Record that the rows of path before byte offset end have been trained on."""
+    tmp = offset_file(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"offset": end, "marked_at": datetime.now().isoformat()}, f)
+    os.replace(tmp, offset_file(path))
+
+
+# ===================== SCALER UPDATE =====================
+def update_scaler(scaler, X_new):
+    """Return a copy of scaler with X_new folded into its running statistics."""
+    new_scaler = copy.deepcopy(scaler)
+    new_scaler.partial_fit(scaler_input(scaler, X_new))
+    return new_scaler
+
+
+def reference_values(X_raw):
+    """Sorted distinct raw values of every feature column."""
+    X_raw = np.asarray(X_raw, dtype=np.float64)
+    return [np.unique(X_raw[:, j]) for j in range(X_raw.shape[1])]
+
+
+def remap_thresholds(thresholds, features, old_scaler, new_scaler, reference, strict, dtype):
+    """Map split thresholds from the old scaled space to the new one.
+
+    A split on scaled value t corresponds to the raw value t * s0 + m0, which
+    in the updated scaling is (t * s0 + m0 - m1) / s1. Scales are positive, so
+    split directions are preserved.
+
+    Trees compare float32 inputs, and many thresholds equal a scaled data
+    value exactly, so the plain formula sends those ties to the other side.
+    Each threshold is therefore snapped: among the reference raw values of its
+    feature, lo is the largest one the old split sends left and hi the
+    smallest one it sends right, and the new threshold is the first of (the
+    remapped value, the midpoint, just past lo) that still separates them in
+    the new scaling. strict is True for "x < t" splits (XGBoost) and False
+    for "x <= t" (scikit-learn); dtype is the precision the model stores
+    thresholds in.
+    """
+    # thresholds exactly as the model compares them (XGBoost JSON is float32)
+    thresholds = np.asarray(thresholds, dtype=dtype).astype(np.float64)
+    features = np.asarray(features)
+    out = np.empty_like(thresholds)
+    inf = np.inf
+
+    for f in np.unique(features):
+        sel = features == f
+        t = thresholds[sel]
+        s0, m0 = old_scaler.scale_[f], old_scaler.mean_[f]
+        s1, m1 = new_scaler.scale_[f], new_scaler.mean_[f]
+        remapped = (t * s0 + m0 - m1) / s1
+
+        refs = reference[f]
+        old_x = ((refs - m0) / s0).astype(np.float32).astype(np.float64)
+        new_x = ((refs - m1) / s1).astype(np.float32).astype(np.float64)
+        k = np.searchsorted(old_x, t, side="left" if strict else "right")
+        lo = np.r_[-inf, new_x][k]
+        hi = np.r_[new_x, inf][k]
+
+        if strict:
+            fallback = np.nextafter(lo.astype(dtype), dtype(inf)).astype(np.float64)
+        else:
+            fallback = np.where(np.isfinite(lo), lo, np.nextafter(hi.astype(dtype), dtype(-inf)))
+
+        snapped = remapped
+        undecided = np.ones(len(t), dtype=bool)
+        for candidate in (remapped, (lo + hi) / 2, fallback):
+            c = candidate.astype(dtype).astype(np.float64)
+            with np.errstate(invalid="ignore"):
+                ok = (lo < c) & (c <= hi) if strict else (lo <= c) & (c < hi)
+            take = undecided & ok
+            snapped = np.where(take, c, snapped)
+            undecided &= ~ok
+        out[sel] = snapped
+    return out
+
+
+# ===================== RANDOM FOREST =====================
+def grow_random_forest(rf, old_scaler, new_scaler, reference, X_new_scaled, y_new, n_trees):
+    """Return a copy of rf with remapped old trees plus n_trees new ones."""
+    rf = copy.deepcopy(rf)
+    for est in rf.estimators_:
+        tree = est.tree_
+        internal = tree.children_left != -1
+        thresholds = tree.threshold
+        thresholds[internal] = remap_thresholds(
+            thresholds[internal], tree.feature[internal], old_scaler, new_scaler,
+            reference, strict=False, dtype=np.float64,
+        )
+
+    rf.set_params(warm_start=True, n_estimators=len(rf.estimators_) + n_trees)
+    rf.fit(X_new_scaled, y_new)
+    return rf
+
+
+# ===================== XGBOOST =====================
+def continue_boosting(xgb, old_scaler, new_scaler, reference, X_new_scaled, y_new, n_rounds):
+    """Return a new classifier that continues boosting from xgb on the new rows."""
+    from xgboost import XGBClassifier
+
+    booster = copy.deepcopy(xgb.get_booster())
+    model = json.loads(booster.save_raw("json"))
+    for tree in model["learner"]["gradient_booster"]["model"]["trees"]:
+        left = np.asarray(tree["left_children"])
+        internal = left != -1
+        if not internal.any():
+            continue
+        conds = np.asarray(tree["split_conditions"], dtype=np.float64)
+        idx = np.asarray(tree["split_indices"])
+        conds[internal] = remap_thresholds(
+            conds[internal], idx[internal], old_scaler, new_scaler,
+            reference, strict=True, dtype=np.float32,
+        )
+        tree["split_conditions"] = conds.tolist()
+    booster.load_model(bytearray(json.dumps(model).encode()))
+
+    params = xgb.get_params()
+    params["n_estimators"] = n_rounds
+    new_xgb = XGBClassifier(**params)
+    new_xgb.fit(X_new_scaled, y_new, xgb_model=booster)
+    return new_xgb
+
+
+# ===================== VALIDATION =====================
+def load_holdout(dataset):
+    return dataset[dataset["Aircraft_ID"].isin(TEST_AIRCRAFT)]
+
+
+def holdout_score(bundle, holdout):
+    X = build_features(holdout, bundle["features"])
+    y = bundle["le"].transform(holdout["Health"])
+    y_pred = bundle["model"].predict(bundle["scaler"].transform(scaler_input(bundle["scaler"], X)))
+    return float(f1_score(y, np.asarray(y_pred).astype(int), average="macro"))
+
+
+def tree_leaves(bundle, holdout):
+    """Leaf index of every hold-out row in every tree, shape (rows, trees)."""
+    X = build_features(holdout, bundle["features"])
+    leaves = bundle["model"].apply(bundle["scaler"].transform(scaler_input(bundle["scaler"], X)))
+    return np.asarray(leaves).reshape(len(X), -1)
+
+
+# ===================== UPDATE STEP =====================
+def incremental_update(kind, new_df, current, holdout, reference_df, n_new=50, tolerance=0.01):
+    """Build a candidate from new_df and decide whether it may be published.
+
+    reference_df holds the readings whose raw values the remapped split
+    thresholds must keep on the same side (normally the whole dataset).
+
+    Returns (candidate_bundle, report). report["accepted"] is True when every
+    hold-out row still reaches the same leaf in every old tree and the
+    candidate's macro F1 on the hold-out aircraft is not more than tolerance
+    below the current model's.
+    """
+    # hold-out aircraft (and copies of them) must never leak into training
+    new_df = new_df[~is_test_aircraft(new_df["Aircraft_ID"])]
+    if new_df.empty:
+        raise ValueError("no new rows outside the hold-out aircraft")
+
+    le = current["le"]
+    missing = set(le.classes_) - set(new_df["Health"].unique())
+    if missing:
+        # a batch without every class would change classes_ of the ensemble
+        raise ValueError(f"new data has no rows for classes: {sorted(missing)}")
+
+    X_new = build_features(new_df, current["features"])
+    y_new = le.transform(new_df["Health"])
+
+    scaler = update_scaler(current["scaler"], X_new)
+    X_new_scaled = scaler.transform(scaler_input(scaler, X_new))
+    reference = reference_values(
+        build_features(pd.concat([reference_df, new_df]), current["features"]).to_numpy(np.float64)
+    )
+
+    grow = grow_random_forest if kind == "rf" else continue_boosting
+    model = grow(current["model"], current["scaler"], scaler, reference, X_new_scaled, y_new, n_new)
+
+    candidate = {"model": model, "scaler": scaler, "le": le, "features": current["features"]}
+
+    # the remapped old trees must route every hold-out row exactly as before
+    old_leaves = tree_leaves(current, holdout)
+    new_leaves = tree_leaves(candidate, holdout)[:, :old_leaves.shape[1]]
+    moved = int((old_leaves != new_leaves).any(axis=1).sum())
+
+    before = holdout_score(current, holdout)
+    after = holdout_score(candidate, holdout)
+    report = {
+        "new_rows": int(len(new_df)),
+        "added": int(n_new),
+        "old_tree_rows_changed": moved,
+        "holdout_f1_before": round(before, 4),
+        "holdout_f1_after": round(after, 4),
+        "accepted": bool(moved == 0 and after >= before - tolerance),
+    }
+    return candidate, report
+
+
+# ===================== MAIN =====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally update the engine health model")
+    parser.add_argument("new_data", help="CSV of new labeled readings (same columns as the dataset)")
+    parser.add_argument("--model", choices=sorted(MODEL_ARTIFACTS), default="rf")
+    parser.add_argument("--trees", type=int, default=50, help="trees to add (rf)")
+    parser.add_argument("--rounds", type=int, default=50, help="boosting rounds to add (xgb)")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="allowed hold-out F1 drop")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, do not publish")
+    args = parser.parse_args(argv)
+
+    current = load_artifacts(args.model)
+    new_df, end = read_new_rows(args.new_data)
+    if new_df.empty:
+        print("No new rows since the last publish")
+        return 0
+    dataset = pd.read_csv(DATASET_FILE)
+    holdout = load_holdout(dataset)
+    n_new = args.trees if args.model == "rf" else args.rounds
+
+    candidate, report = incremental_update(args.model, new_df, current, holdout, dataset,
+                                           n_new, args.tolerance)
+    print(json.dumps(report, indent=2))
+
+    if report["old_tree_rows_changed"]:
+        print("Candidate rejected: remapped old trees route hold-out rows differently; current model kept")
+        return 1
+    if not report["accepted"]:
+        print("Candidate rejected: hold-out score dropped; current model kept")
+        return 1
+    if args.dry_run:
+        print("Dry run: candidate not published")
+        return 0
+
+    version = publish_artifacts(args.model, candidate, report)
+    mark_used(args.new_data, end)
+    print("Published model version", version["version"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""Replay / synthetic load generator for the Flask API.
+
+Drives app.py with many concurrent virtual aircraft. Every aircraft is an
+asyncio task that sends its readings on the recorded schedule (compressed by
+--speedup) to a mix of endpoints. Each reading is sent at most once and in
+order: predict posts the reading that just came due, and the batch endpoints
+collect that reading and the aircraft's next ones as they come due, posting
+them together once there are --batch of them.
+
+  predict  POST /predict        one reading
+  batch    POST /predict/batch  --batch readings
+  explain  POST /explain/batch  --batch readings
+  ingest   POST /ingest         --batch labeled readings
+  latest   GET  /sensor/latest
+
+ingest is not in the default mix: /ingest appends to the file incremental.py
+trains on, and replayed clones of the hold-out aircraft or synthetic
+readings do not belong there. Point INGEST_FILE in config.json at a scratch
+file before adding it to --mix.
+
+Readings come from adour_engine_stable_ml_dataset.csv (replay; aircraft are
+cloned as HAL-HJT-xx-k when --aircraft exceeds the recorded fleet) or from
+utils.generate_sample (synthetic). A pool of --sessions logged-in aiohttp
+sessions (one /login each, keep-alive connection pools) is shared by the
+aircraft round-robin.
+
+Reports throughput, p50/p95/p99 latency and error rate per endpoint.
+
+Usage:
+    python loadgen.py --user demo --password demo --aircraft 2000 --duration 60
+    python loadgen.py --source synthetic --aircraft 5000 --speedup 3000 \\
+        --mix predict=0.6,latest=0.2,batch=0.1,explain=0.1 --register
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import aiohttp
+
+from utils import generate_sample
+
+DATASET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "adour_engine_stable_ml_dataset.csv")
+ENDPOINTS = {
+    "predict": ("POST", "/predict"),
+    "batch": ("POST", "/predict/batch"),
+    "explain": ("POST", "/explain/batch"),
+    "ingest": ("POST", "/ingest"),
+    "latest": ("GET", "/sensor/latest"),
+}
+BATCH_ENDPOINTS = {"batch", "explain", "ingest"}
+SAMPLING_MINUTES = [10, 15]
+
+
+# ===================== READING SOURCES =====================
+def replay_streams(csv_path, n_aircraft):
+    """Per-aircraft lists of (offset_seconds, reading) from the recorded data."""
+    df = pd.read_csv(csv_path)
+    df["Timestamp"] = pd.to_datetime(df["Timestamp"])
+    recorded = {}
+    for ac, g in df.sort_values("Timestamp").groupby("Aircraft_ID"):
+        offsets = (g["Timestamp"] - g["Timestamp"].iloc[0]).dt.total_seconds().to_numpy()
+        g = g.assign(Timestamp=g["Timestamp"].astype(str))
+        recorded[ac] = list(zip(offsets, g.to_dict("records")))
+
+    base_ids = sorted(recorded)
+    streams = {}
+    for i in range(n_aircraft):
+        base = base_ids[i % len(base_ids)]
+        k = i // len(base_ids)
+        ac = base if k == 0 else f"{base}-{k}"
+        streams[ac] = [(t, dict(r, Aircraft_ID=ac)) for t, r in recorded[base]]
+    return streams
+
+
+def looped(stream, span):
+    """Repeat a recorded stream forever, shifting each pass by span seconds."""
+    k = 0
+    while True:
+        for t, reading in stream:
+            yield t + k * span, reading
+        k += 1
+
+
+def synthetic_stream(aircraft_id):
+    """Endless (offset_seconds, reading) generator in the style of data.py."""
+    t = 0.0
+    while True:
+        t += random.choice(SAMPLING_MINUTES) * 60
+        # labeled with the health state the sensors were generated from
+        yield t, generate_sample(aircraft_id=aircraft_id, labeled=True)
+
+
+# ===================== STATS =====================
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.late = 0
+
+    def record(self, endpoint, seconds, ok):
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        out = {}
+        for ep, lat in sorted(self.latencies.items()):
+            ms = np.asarray(lat) * 1000
+            out[ep] = {
+                "requests": len(lat),
+                "throughput_rps": round(len(lat) / elapsed, 1),
+                "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                "p95_ms": round(float(np.percentile(ms, 95)), 2),
+                "p99_ms": round(float(np.percentile(ms, 99)), 2),
+                "error_rate": round(self.errors[ep] / len(lat), 4),
+            }
+        return out
+
+
+# ===================== CLIENT =====================
+async def open_sessions(base_url, n, user, password, pool_size, register):
+    """Log in n sessions; each keeps its own cookie and keep-alive pool."""
+    if register:
+        async with aiohttp.ClientSession() as s:
+            async with s.post(base_url + "/register",
+                              json={"username": user, "email": f"{user}@example.com", "password": password}) as r:
+                await r.read()
+
+    sessions = []
+    for _ in range(n):
+        s = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=pool_size),
+            # the default jar drops cookies from IP hosts such as 127.0.0.1
+            cookie_jar=aiohttp.CookieJar(unsafe=True),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+        async with s.post(base_url + "/login", json={"username": user, "password": password}) as r:
+            if r.status != 200:
+                await s.close()
+                for other in sessions:
+                    await other.close()
+                raise RuntimeError(f"login failed ({r.status}): {await r.text()}")
+        sessions.append(s)
+    return sessions
+
+
+async def send(session, base_url, endpoint, readings, stats):
+    method, path = ENDPOINTS[endpoint]
+    if endpoint == "predict":
+        body = {k: v for k, v in readings[0].items() if k != "Health"}
+    elif endpoint == "latest":
+        body = None
+    else:
+        body = readings
+
+    t0 = time.perf_counter()
+    try:
+        async with session.request(method, base_url + path, json=body) as r:
+            await r.read()
+            ok = r.status < 400
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        ok = False
+    stats.record(endpoint, time.perf_counter() - t0, ok)
+
+
+async def virtual_aircraft(stream, session, base_url, mix, batch, speedup, deadline, stats):
+    endpoints, weights = zip(*mix.items())
+    # spread first sends over one sampling interval so the fleet does not fire at once
+    start = time.perf_counter() + random.uniform(0, SAMPLING_MINUTES[0] * 60 / speedup)
+    pending = None  # (endpoint, readings) of a batch request being collected
+    for offset, reading in stream:
+        due = start + offset / speedup
+        now = time.perf_counter()
+        if due >= deadline or now >= deadline:
+            return
+        if due > now:
+            await asyncio.sleep(due - now)
+        else:
+            stats.late += 1
+
+        if pending is None:
+            endpoint = random.choices(endpoints, weights)[0]
+            if endpoint not in BATCH_ENDPOINTS:
+                await send(session, base_url, endpoint, [reading], stats)
+                continue
+            pending = (endpoint, [])
+
+        endpoint, readings = pending
+        readings.append(reading)
+        if len(readings) >= batch:
+            pending = None
+            await send(session, base_url, endpoint, readings, stats)
+
+    # a finite replay ended before the deadline: send what was collected
+    if pending is not None and time.perf_counter() < deadline:
+        await send(session, base_url, pending[0], pending[1], stats)
+
+
+async def run(args):
+    mix = {k: float(v) for k, v in (item.split("=") for item in args.mix.split(","))}
+    unknown = set(mix) - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"unknown endpoints in --mix: {sorted(unknown)}")
+
+    if args.source == "replay":
+        streams = replay_streams(args.csv, args.aircraft)
+        if args.loop:
+            span = max(s[-1][0] for s in streams.values()) + SAMPLING_MINUTES[-1] * 60
+            streams = {ac: looped(s, span) for ac, s in streams.items()}
+    else:
+        streams = {f"SIM-{i:05d}": synthetic_stream(f"SIM-{i:05d}") for i in range(args.aircraft)}
+
+    sessions = await open_sessions(args.url, args.sessions, args.user, args.password,
+                                   args.pool_size, args.register)
+    stats = Stats()
+    t0 = time.perf_counter()
+    deadline = t0 + args.duration
+    try:
+        tasks = [
+            virtual_aircraft(iter(stream), sessions[i % len(sessions)], args.url, mix,
+                             args.batch, args.speedup, deadline, stats)
+            for i, stream in enumerate(streams.values())
+        ]
+        await asyncio.gather(*tasks)
+    finally:
+        for s in sessions:
+            await s.close()
+    elapsed = time.perf_counter() - t0
+
+    report = {
+        "aircraft": len(streams),
+        "source": args.source,
+        "speedup": args.speedup,
+        "elapsed_s": round(elapsed, 2),
+        "late_sends": stats.late,
+        "endpoints": stats.report(elapsed),
+    }
+    return report
+
+
+# ===================== MAIN =====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load generator for the engine health API")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--register", action="store_true", help="register the user first")
+    parser.add_argument("--source", choices=["replay", "synthetic"], default="replay")
+    parser.add_argument("--csv", default=DATASET_FILE)
+    parser.add_argument("--loop", action="store_true", help="repeat the recording until --duration")
+    parser.add_argument("--aircraft", type=int, default=1000, help="virtual aircraft")
+    parser.add_argument("--speedup", type=float, default=600.0, help="simulated seconds per real second")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of load")
+    parser.add_argument("--mix", default="predict=0.7,batch=0.1,latest=0.1,explain=0.1",
+                        help="endpoint weights (ingest writes training data; see above)")
+    parser.add_argument("--batch", type=int, default=20, help="readings per batch/ingest request")
+    parser.add_argument("--sessions", type=int, default=16, help="logged-in client sessions")
+    parser.add_argument("--pool-size", type=int, default=64, help="connections per session")
+    parser.add_argument("--report", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+
+    print(f"{report['aircraft']} aircraft, {report['elapsed_s']} s, late sends: {report['late_sends']}")
+    print(f"{'endpoint':<10} {'requests':>9} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for ep, r in report["endpoints"].items():
+        print(f"{ep:<10} {r['requests']:>9} {r['throughput_rps']:>8} {r['p50_ms']:>8} "
+              f"{r['p95_ms']:>8} {r['p99_ms']:>8} {r['error_rate'] * 100:>6.2f}%")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
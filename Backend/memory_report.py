@@ -0,0 +1,173 @@
+"""Peak RSS of training with the pandas-default pipeline vs. dataset.py.
+
+Each pipeline runs in its own subprocess so peak RSS is measured from a clean
+process. The dataset is replicated --scale times (each copy gets its own
+aircraft IDs) to approximate fleet-scale data.
+
+  legacy  : pd.read_csv defaults, .copy(), drop, get_dummies, align,
+            LabelEncoder, StandardScaler().fit_transform   (randomforest.py before)
+  compact : load_dataset (float32 / int8 codes / mmap cache), feature_matrix,
+            StandardScaler(copy=False)                    (randomforest.py now)
+
+Usage:
+    python memory_report.py --scale 50 --trees 50
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+import pandas as pd
+
+from utils import TRAIN_AIRCRAFT, TEST_AIRCRAFT
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_FILE = os.path.join(BASE_DIR, "adour_engine_stable_ml_dataset.csv")
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 ** 2
+
+
+def scaled_copy(csv_path, scale, out_path):
+    """Write the dataset repeated scale times; copy k renames HAL-HJT-xx to HAL-HJT-xx-k."""
+    df = pd.read_csv(csv_path)
+    with open(out_path, "w", newline="") as f:
+        for k in range(scale):
+            part = df.copy()
+            if k:
+                part["Aircraft_ID"] = part["Aircraft_ID"] + f"-{k}"
+            part.to_csv(f, header=(k == 0), index=False)
+
+
+def split_ids(ids):
+    """Scaled aircraft IDs follow the same train/test split as their originals."""
+    train = [a for a in ids if a[:10] in TRAIN_AIRCRAFT]
+    test = [a for a in ids if a[:10] in TEST_AIRCRAFT]
+    return train, test
+
+
+# ===================== PIPELINES =====================
+def run_legacy(csv_path, trees):
+    from sklearn.preprocessing import LabelEncoder, StandardScaler
+    from sklearn.ensemble import RandomForestClassifier
+
+    df = pd.read_csv(csv_path)
+    train_aircraft, test_aircraft = split_ids(df["Aircraft_ID"].unique())
+    train_df = df[df["Aircraft_ID"].isin(train_aircraft)].copy()
+    test_df = df[df["Aircraft_ID"].isin(test_aircraft)].copy()
+
+    drop_cols = ["Timestamp", "Aircraft_ID", "Engine_Model", "Health", "Severity"]
+    X_train = pd.get_dummies(train_df.drop(columns=drop_cols), columns=["Phase"])
+    X_test = pd.get_dummies(test_df.drop(columns=drop_cols), columns=["Phase"])
+    X_train, X_test = X_train.align(X_test, join="left", axis=1, fill_value=0)
+
+    le = LabelEncoder()
+    y_train = le.fit_transform(train_df["Health"])
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    rf = RandomForestClassifier(n_estimators=trees, max_depth=14, class_weight="balanced",
+                                random_state=42, n_jobs=1)
+    rf.fit(X_train_scaled, y_train)
+    rf.predict(X_test_scaled)
+
+
+def run_compact(csv_path, trees):
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.ensemble import RandomForestClassifier
+    from dataset import load_dataset, aircraft_rows, feature_matrix, label_codes
+
+    df = load_dataset(csv_path)
+    train_aircraft, test_aircraft = split_ids(list(df["Aircraft_ID"].cat.categories))
+    train_rows = aircraft_rows(df, train_aircraft)
+    test_rows = aircraft_rows(df, test_aircraft)
+
+    X_train = feature_matrix(df, train_rows)
+    X_test = feature_matrix(df, test_rows)
+    y_train = label_codes(df, train_rows)
+
+    scaler = StandardScaler(copy=False)
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    rf = RandomForestClassifier(n_estimators=trees, max_depth=14, class_weight="balanced",
+                                random_state=42, n_jobs=1)
+    rf.fit(X_train_scaled, y_train)
+    rf.predict(X_test_scaled)
+
+
+PIPELINES = {"legacy": run_legacy, "compact": run_compact}
+
+
+def measure(name, csv_path, trees):
+    """Run one pipeline in a fresh interpreter and return its stats."""
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run", name,
+         "--csv", csv_path, "--trees", str(trees)],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+# ===================== MAIN =====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peak RSS report for training pipelines")
+    parser.add_argument("--scale", type=int, default=20, help="dataset replication factor")
+    parser.add_argument("--trees", type=int, default=50)
+    parser.add_argument("--run", choices=sorted(PIPELINES), help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    parser.add_argument("--report", default=os.path.join(BASE_DIR, "memory_report.json"))
+    args = parser.parse_args(argv)
+
+    if args.run:
+        t0 = time.perf_counter()
+        PIPELINES[args.run](args.csv, args.trees)
+        print(json.dumps({"pipeline": args.run, "peak_rss_mb": round(peak_rss_mb(), 1),
+                          "seconds": round(time.perf_counter() - t0, 2)}))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "fleet.csv")
+        scaled_copy(DATASET_FILE, args.scale, csv_path)
+        rows = sum(1 for _ in open(csv_path)) - 1
+
+        # build the compact cache once, so "compact" measures a warm mmap load
+        measure("compact", csv_path, args.trees)
+        results = [measure(name, csv_path, args.trees) for name in ("legacy", "compact")]
+
+    before, after = results
+    report = {
+        "rows": rows,
+        "scale": args.scale,
+        "trees": args.trees,
+        "legacy": before,
+        "compact": after,
+        "peak_rss_reduction": round(1 - after["peak_rss_mb"] / before["peak_rss_mb"], 3),
+    }
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"rows: {rows}")
+    print(f"legacy : peak RSS {before['peak_rss_mb']:8.1f} MB  {before['seconds']:6.2f} s")
+    print(f"compact: peak RSS {after['peak_rss_mb']:8.1f} MB  {after['seconds']:6.2f} s")
+    print(f"peak RSS reduction: {report['peak_rss_reduction'] * 100:.1f}%")
+    print("Report written to", args.report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,56 +1,44 @@
 # ===================== IMPORTS =====================
-import pandas as pd
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, confusion_matrix
 
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping
 
+from dataset import load_dataset, aircraft_rows, feature_matrix, label_codes, label_encoder
+from utils import TRAIN_AIRCRAFT, TEST_AIRCRAFT
+
 sns.set_style("whitegrid")
 
 # ===================== LOAD DATA =====================
-df = pd.read_csv("adour_engine_stable_ml_dataset.csv")
+# typed columns (float32 sensors, int8 category codes), memory-mapped cache
+df = load_dataset("adour_engine_stable_ml_dataset.csv")
 
 # ===================== AIRCRAFT-WISE SPLIT =====================
-train_aircraft = ["HAL-HJT-01", "HAL-HJT-02", "HAL-HJT-03", "HAL-HJT-04"]
-test_aircraft  = ["HAL-HJT-05", "HAL-HJT-06"]
-
-train_df = df[df["Aircraft_ID"].isin(train_aircraft)].copy()
-test_df  = df[df["Aircraft_ID"].isin(test_aircraft)].copy()
-
-# ===================== FEATURE SELECTION =====================
-drop_cols = [
-    "Timestamp",
-    "Aircraft_ID",
-    "Engine_Model",
-    "Health",
-    "Severity"
-]
-
-X_train = train_df.drop(columns=drop_cols)
-X_test  = test_df.drop(columns=drop_cols)
-
-y_train = train_df["Health"]
-y_test  = test_df["Health"]
-
-# ===================== ONE-HOT ENCODING =====================
-X_train = pd.get_dummies(X_train, columns=["Phase"])
-X_test  = pd.get_dummies(X_test, columns=["Phase"])
+# rows are stored sorted by aircraft, so these are slices (views), not copies
+train_rows = aircraft_rows(df, TRAIN_AIRCRAFT)
+test_rows  = aircraft_rows(df, TEST_AIRCRAFT)
 
-X_train, X_test = X_train.align(X_test, join="left", axis=1, fill_value=0)
+# ===================== FEATURES =====================
+# one float32 matrix per split with Phase one-hot filled in place;
+# Timestamp, Aircraft_ID, Engine_Model, Health and Severity are never used
+X_train = feature_matrix(df, train_rows)
+X_test  = feature_matrix(df, test_rows)
 
 # ===================== LABEL ENCODING =====================
-le = LabelEncoder()
-y_train_enc = le.fit_transform(y_train)
-y_test_enc  = le.transform(y_test)
+# Health codes already match LabelEncoder (classes sorted by name)
+le = label_encoder()
+y_train_enc = label_codes(df, train_rows)
+y_test_enc  = label_codes(df, test_rows)
 
 # ===================== FEATURE SCALING =====================
-scaler = StandardScaler()
+# copy=False scales the float32 matrices in place
+scaler = StandardScaler(copy=False)
 X_train_scaled = scaler.fit_transform(X_train)
 X_test_scaled  = scaler.transform(X_test)
 
@@ -0,0 +1,328 @@
+"""Declarative alert rules, compiled to NumPy masks and evaluated per batch.
+
+Rules live in config.json under "ALERT_RULES":
+
+    {
+      "name": "takeoff_egt_high",
+      "severity": "CRITICAL",
+      "phase": ["TAKEOFF"],              # optional scope
+      "aircraft": ["HAL-HJT-01"],        # optional scope
+      "when": [                          # all conditions must hold
+        {"field": "EGT", "op": ">", "value": 700},
+        {"field": "prob.CRITICAL", "op": ">=", "value": 0.5},
+        {"field": "prediction", "op": "in", "value": ["WARNING", "CRITICAL"]}
+      ],
+      "window": {"n": 3, "m": 5}         # optional: fire when N of the last M hit
+    }
+
+Fields are reading columns (sensors, Phase, Aircraft_ID, ...), "prediction"
+(model label) and "prob.<CLASS>"; any other field rejects the config.
+Operators: > >= < <= == != in not_in between outside.
+
+Every rule is compiled once into a list of mask functions. A batch is a dict
+of column arrays; evaluating a rule is a handful of vectorized comparisons
+over the whole batch. N-of-M windows keep the last M-1 outcomes per
+(rule, aircraft) as a bit mask and are evaluated for all rows of the batch
+with cumulative sums over rows grouped by aircraft.
+
+The engine reloads the rules when config.json changes. Every compiled rule
+is test-run on a probe batch with the column types the app sends, so a rule
+that cannot be evaluated (e.g. "Phase" > 3) rejects the whole config and the
+previous rules stay active. A rule that still fails on a live batch is
+skipped for that batch and reported as broken by stats().
+"""
+
+import os
+import json
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dataset import NUMERIC_FEATURES
+
+MAX_WINDOW = 62
+
+# Used when the config has no ALERT_RULES: the historical "alert on any
+# non-NORMAL prediction" behaviour
+DEFAULT_RULES = [
+    {"name": "model_anomaly", "severity": "WARNING",
+     "when": [{"field": "prediction", "op": "!=", "value": "NORMAL"}]},
+]
+
+OPS = {
+    ">": lambda col, v: col > v,
+    ">=": lambda col, v: col >= v,
+    "<": lambda col, v: col < v,
+    "<=": lambda col, v: col <= v,
+    "==": lambda col, v: col == v,
+    "!=": lambda col, v: col != v,
+    "in": lambda col, v: np.isin(col, v),
+    "not_in": lambda col, v: ~np.isin(col, v),
+    "between": lambda col, v: (col >= v[0]) & (col <= v[1]),
+    "outside": lambda col, v: (col < v[0]) | (col > v[1]),
+}
+
+
+# ===================== COMPILATION =====================
+def compile_condition(cond):
+    field = cond["field"]
+    op = cond["op"]
+    value = cond["value"]
+    if op not in OPS:
+        raise ValueError(f"unknown operator {op!r}")
+    if op in ("between", "outside") and (not isinstance(value, list) or len(value) != 2):
+        raise ValueError(f"{op} needs [low, high], got {value!r}")
+    if op in ("in", "not_in"):
+        value = np.asarray(value if isinstance(value, list) else [value])
+    if field not in FIELDS:
+        # a misspelt field would otherwise never match and never be noticed
+        raise ValueError(f"unknown field {field!r}, expected one of {sorted(FIELDS)}")
+    fn = OPS[op]
+
+    def mask(batch):
+        col = batch.get(field)
+        if col is None:
+            return np.zeros(batch["rows"], dtype=bool)
+        with np.errstate(invalid="ignore"):
+            return fn(col, value)
+
+    return mask
+
+
+def compile_rule(rule):
+    name = rule.get("name")
+    if not name:
+        raise ValueError("rule without a name")
+    conditions = [compile_condition(c) for c in rule.get("when", [])]
+    if not conditions:
+        raise ValueError(f"rule {name!r} has no conditions")
+
+    window = rule.get("window")
+    if window:
+        n, m = int(window["n"]), int(window["m"])
+        if not 1 <= n <= m <= MAX_WINDOW:
+            raise ValueError(f"rule {name!r}: window needs 1 <= n <= m <= {MAX_WINDOW}")
+        window = (n, m)
+
+    return {
+        "name": name,
+        "severity": rule.get("severity", "WARNING"),
+        "phase": np.asarray(rule["phase"]) if rule.get("phase") else None,
+        "aircraft": np.asarray(rule["aircraft"]) if rule.get("aircraft") else None,
+        "conditions": conditions,
+        "window": window,
+    }
+
+
+def compile_rules(rules):
+    compiled = [compile_rule(r) for r in rules]
+    names = [r["name"] for r in compiled]
+    if len(set(names)) != len(names):
+        raise ValueError("rule names must be unique")
+    return compiled
+
+
+# ===================== BATCHES =====================
+def make_batch(df, labels, proba, classes):
+    """Column arrays for a batch of readings and their model outputs."""
+    batch = {c: df[c].to_numpy() for c in df.columns}
+    # a missing reading would leave an object column that > / < cannot compare;
+    # as NaN it simply never matches
+    for c in NUMERIC_FEATURES:
+        if c in batch:
+            batch[c] = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)
+    batch["rows"] = len(df)
+    batch["prediction"] = np.asarray(labels)
+    for i, cls in enumerate(classes):
+        batch[f"prob.{cls}"] = proba[:, i]
+    if "Aircraft_ID" not in batch:
+        batch["Aircraft_ID"] = np.full(len(df), "UNKNOWN", dtype=object)
+    return batch
+
+
+def probe_batch():
+    """Two readings with every column type the app sends, for test-running rules."""
+    readings = pd.DataFrame({
+        "Timestamp": ["2025-01-01 00:00:00", "2025-01-01 00:10:00"],
+        "Aircraft_ID": ["PROBE-1", "PROBE-2"],
+        "Engine_Model": ["Adour Mk-821", "Adour Mk-821"],
+        "Flight_Hours": [0.5, 1.0],
+        "Phase": ["IDLE", "TAKEOFF"],
+        "Throttle": [0.3, 0.95],
+        "RPM": [950.0, 3000.0],
+        "FuelFlow": [740.0, 1300.0],
+        "EGT": [575.0, 720.0],
+        "OilTemp": [75.0, 110.0],
+        "OilPressure": [54.0, 40.0],
+        "Vibration": [1.3, 4.0],
+    })
+    classes = ["CRITICAL", "NORMAL", "WARNING"]
+    proba = np.array([[0.1, 0.8, 0.1], [0.6, 0.1, 0.3]])
+    return make_batch(readings, ["NORMAL", "CRITICAL"], proba, classes)
+
+
+# everything a condition can name: reading columns, "prediction", "prob.<CLASS>"
+FIELDS = frozenset(probe_batch()) - {"rows"}
+
+
+# ===================== N-OF-M WINDOWS =====================
+def window_hits(hits, aircraft, history, n, m):
+    """Apply an N-of-M window to per-row hits, in row order per aircraft.
+
+    history maps aircraft -> int whose bit j is the outcome j+1 events ago
+    (only the last m-1 are kept); it is updated in place.
+    """
+    rows = len(hits)
+    order = np.argsort(aircraft, kind="stable")
+    ac_sorted = aircraft[order]
+    h = hits[order].astype(np.int64)
+
+    starts = np.flatnonzero(np.r_[True, ac_sorted[1:] != ac_sorted[:-1]])
+    ends = np.r_[starts[1:], rows]
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+    pos = np.arange(rows) - starts[group]
+    keys = ac_sorted[starts]
+    old = np.fromiter((history.get(k, 0) for k in keys), dtype=np.int64, count=len(keys))
+
+    # hits inside the batch that fall in each row's window
+    csum = np.r_[0, np.cumsum(h)]
+    idx = np.arange(rows)
+    lo = np.maximum(idx - m + 1, starts[group])
+    total = csum[idx + 1] - csum[lo]
+
+    # plus the most recent (m-1-pos) outcomes from before this batch
+    k = m - 1 - pos
+    row_old = old[group]
+    for j in range(m - 1):
+        total += ((row_old >> j) & 1) * (j < k)
+
+    fired = np.empty(rows, dtype=bool)
+    fired[order] = total >= n
+
+    # new history: last m-1 outcomes of (old history + this batch) per aircraft
+    lengths = ends - starts
+    new = np.zeros(len(starts), dtype=np.int64)
+    for j in range(m - 1):
+        in_batch = j < lengths
+        src = np.where(in_batch, ends - 1 - j, 0)
+        bit = np.where(in_batch, h[src], (old >> np.maximum(j - lengths, 0)) & 1)
+        new |= bit << j
+    history.update(zip(keys.tolist(), new.tolist()))
+    return fired
+
+
+# ===================== ENGINE =====================
+class RuleEngine:
+    def __init__(self, config_file, key="ALERT_RULES"):
+        self.config_file = config_file
+        self.key = key
+        self.lock = threading.Lock()
+        self.rules = []
+        self.version = 0
+        self.mtime = None
+        self.history = {}          # rule name -> {aircraft: bits}
+        self.broken = {}           # rule name -> last evaluation error
+        self.rows_evaluated = 0
+        self.seconds = 0.0
+        self.reload()
+
+    # ---------------- loading ----------------
+    def reload(self):
+        """Recompile the rules from the config file; keep the old ones on error."""
+        mtime = os.path.getmtime(self.config_file) if os.path.exists(self.config_file) else None
+        try:
+            with open(self.config_file, "r") as f:
+                rules = json.load(f).get(self.key, DEFAULT_RULES)
+            compiled = compile_rules(rules)
+            self.probe(compiled)
+        except Exception as e:
+            print("Alert rules not loaded:", e)
+            self.mtime = mtime
+            return False
+
+        with self.lock:
+            self.rules = compiled
+            self.version += 1
+            self.mtime = mtime
+            # windows of rules that no longer exist or changed shape start over
+            self.history = {}
+            self.broken = {}
+        return True
+
+    def probe(self, rules):
+        """Raise ValueError naming the first rule that cannot be evaluated."""
+        batch = probe_batch()
+        for rule in rules:
+            try:
+                mask = np.asarray(self.rule_mask(rule, batch))
+            except Exception as e:
+                raise ValueError(f"rule {rule['name']!r} cannot be evaluated: {e}") from e
+            if mask.shape != (batch["rows"],):
+                raise ValueError(f"rule {rule['name']!r} does not give one result per reading")
+
+    def watch(self, interval):
+        """Reload the rules when the config file changes."""
+        while True:
+            time.sleep(interval)
+            try:
+                if os.path.exists(self.config_file) and os.path.getmtime(self.config_file) != self.mtime:
+                    if self.reload():
+                        print("Alert rules reloaded, version", self.version)
+            except Exception as e:
+                print("Rule reload warning:", e)
+
+    # ---------------- evaluation ----------------
+    def rule_mask(self, rule, batch):
+        mask = np.ones(batch["rows"], dtype=bool)
+        if rule["phase"] is not None:
+            mask &= np.isin(batch.get("Phase", np.full(batch["rows"], None)), rule["phase"])
+        if rule["aircraft"] is not None:
+            mask &= np.isin(batch["Aircraft_ID"], rule["aircraft"])
+        for cond in rule["conditions"]:
+            if not mask.any():
+                break
+            mask &= cond(batch)
+        return mask
+
+    def evaluate(self, batch):
+        """Return a list of alerts (dicts) for the rows of the batch that fire."""
+        t0 = time.perf_counter()
+        with self.lock:
+            alerts = []
+            aircraft = np.asarray(batch["Aircraft_ID"]).astype(str)
+            phases = batch.get("Phase")
+            for rule in self.rules:
+                try:
+                    mask = self.rule_mask(rule, batch)
+                except Exception as e:
+                    # one bad rule must not take the others (or the request) down
+                    if rule["name"] not in self.broken:
+                        print(f"Alert rule {rule['name']!r} failed:", e)
+                    self.broken[rule["name"]] = str(e)
+                    continue
+                if rule["window"]:
+                    n, m = rule["window"]
+                    history = self.history.setdefault(rule["name"], {})
+                    mask = window_hits(mask, aircraft, history, n, m)
+                for i in np.flatnonzero(mask):
+                    alerts.append({
+                        "rule": rule["name"],
+                        "severity": rule["severity"],
+                        "row": int(i),
+                        "aircraft_id": aircraft[i],
+                        "phase": None if phases is None else str(phases[i]),
+                    })
+            self.rows_evaluated += batch["rows"]
+            self.seconds += time.perf_counter() - t0
+        return alerts
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "rules": [r["name"] for r in self.rules],
+            "broken": dict(self.broken),
+            "rows_evaluated": self.rows_evaluated,
+            "rows_per_second": round(self.rows_evaluated / self.seconds, 1) if self.seconds else None,
+        }
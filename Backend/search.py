@@ -0,0 +1,322 @@
+"""Hyperparameter search with leave-aircraft-out cross-validation.
+
+The training scripts use one fixed split and fixed hyperparameters. This
+script searches over Random Forest / XGBoost settings instead:
+
+  * folds leave one training aircraft out at a time (grouped by Aircraft_ID),
+    the hold-out aircraft (HAL-HJT-05/06) are only used for the final report,
+  * candidates are evaluated in parallel on a process pool,
+  * successive halving: every candidate starts on a few folds and only the
+    best 1/eta by objective, plus the rung's Pareto front, move on to more
+    folds, so weak settings are dropped early; survivors are only fitted on
+    the folds a rung adds,
+  * XGBoost candidates early-stop on one of the training aircraft of the
+    fold, never on the aircraft being scored,
+  * single-row predict_proba latency (what /predict pays) is measured for
+    every candidate and traded off against macro F1.
+
+Candidates are ranked on  F1 - latency_weight * latency_ms  and the
+accuracy-vs-latency Pareto front of the last rung is written to the report.
+Keeping every non-dominated candidate alive means the front is measured on
+all folds and is not reduced to the few settings the objective favoured.
+
+Usage:
+    python search.py --model rf --candidates 24 --workers 4
+    python search.py --model xgb --latency-weight 0.02 --report xgb_search.json
+"""
+
+# ===================== IMPORTS =====================
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterSampler
+
+from utils import TRAIN_AIRCRAFT, TEST_AIRCRAFT, build_features
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASET_FILE = os.path.join(BASE_DIR, "adour_engine_stable_ml_dataset.csv")
+
+# ===================== SEARCH SPACE =====================
+# n_estimators / max_depth drive inference cost as much as accuracy
+SEARCH_SPACE = {
+    "rf": {
+        "n_estimators": [25, 50, 100, 200, 300],
+        "max_depth": [6, 8, 10, 14, None],
+        "min_samples_leaf": [1, 2, 4, 8],
+        "max_features": ["sqrt", 0.5, None],
+    },
+    "xgb": {
+        "n_estimators": [50, 100, 200, 300],
+        "max_depth": [3, 4, 6, 8],
+        "learning_rate": [0.03, 0.05, 0.1, 0.2],
+        "subsample": [0.7, 0.8, 1.0],
+        "colsample_bytree": [0.6, 0.8, 1.0],
+    },
+}
+
+EARLY_STOPPING_ROUNDS = 20
+LATENCY_REPEATS = 30
+
+
+# ===================== MODELS =====================
+def make_model(kind, params):
+    if kind == "rf":
+        return RandomForestClassifier(
+            class_weight="balanced", random_state=42, n_jobs=1, **params
+        )
+
+    from xgboost import XGBClassifier
+
+    return XGBClassifier(
+        objective="multi:softprob",
+        num_class=3,
+        eval_metric="mlogloss",
+        early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+        random_state=42,
+        n_jobs=1,
+        **params,
+    )
+
+
+def fit_model(kind, params, X_train, y_train, X_val, y_val):
+    model = make_model(kind, params)
+    if kind == "xgb":
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+    else:
+        model.fit(X_train, y_train)
+    return model
+
+
+def early_stopping_split(kind, groups):
+    """Rows to fit on; XGBoost holds out the last training aircraft to early-stop on."""
+    fit_on = np.ones(len(groups), dtype=bool)
+    if kind == "xgb":
+        fit_on = groups != max(groups)
+    return fit_on
+
+
+def single_row_latency_ms(model, X, repeats=LATENCY_REPEATS):
+    """Median wall time of predict_proba on one row, as served by /predict."""
+    row = X[:1]
+    model.predict_proba(row)  # warm-up
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        model.predict_proba(row)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times) * 1000)
+
+
+def used_trees(kind, model):
+    if kind == "xgb" and getattr(model, "best_iteration", None) is not None:
+        return int(model.best_iteration) + 1
+    return int(model.get_params()["n_estimators"])
+
+
+# ===================== WORKER =====================
+# Data is shipped to each worker once through the pool initializer
+_DATA = {}
+
+
+def _init_worker(X, y, groups):
+    _DATA["X"] = X
+    _DATA["y"] = y
+    _DATA["groups"] = groups
+
+
+def evaluate_fold(kind, params, group):
+    """Fit one candidate without the given aircraft and score it on that aircraft."""
+    X, y, groups = _DATA["X"], _DATA["y"], _DATA["groups"]
+    val = groups == group
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[~val])
+    X_val = scaler.transform(X[val])
+
+    y_train = y[~val]
+    # early stopping must not see the aircraft that is scored
+    fit_on = early_stopping_split(kind, groups[~val])
+    model = fit_model(kind, params, X_train[fit_on], y_train[fit_on], X_train[~fit_on], y_train[~fit_on])
+    return {
+        "f1": f1_score(y[val], model.predict(X_val), average="macro"),
+        "latency_ms": single_row_latency_ms(model, X_val),
+        "trees": used_trees(kind, model),
+    }
+
+
+def combine_folds(fold_results):
+    """Leave-one-aircraft-out CV summary of one candidate over its folds."""
+    scores = [r["f1"] for r in fold_results]
+    return {
+        "f1": float(np.mean(scores)),
+        "f1_std": float(np.std(scores)),
+        "latency_ms": float(np.median([r["latency_ms"] for r in fold_results])),
+        "trees": int(np.median([r["trees"] for r in fold_results])),
+        "folds": len(fold_results),
+    }
+
+
+# ===================== RANKING =====================
+def objective(result, latency_weight):
+    return result["f1"] - latency_weight * result["latency_ms"]
+
+
+def pareto_front(results):
+    """Candidates not dominated on (higher F1, lower latency)."""
+    front = []
+    for r in results:
+        dominated = any(
+            o["f1"] >= r["f1"] and o["latency_ms"] <= r["latency_ms"]
+            and (o["f1"] > r["f1"] or o["latency_ms"] < r["latency_ms"])
+            for o in results
+        )
+        if not dominated:
+            front.append(r)
+    return sorted(front, key=lambda r: r["latency_ms"])
+
+
+def fold_schedule(n_folds, eta, min_folds):
+    """Folds evaluated per rung, e.g. 4 folds, eta=2 -> [1, 2, 4]."""
+    rungs = []
+    f = n_folds
+    while f >= min_folds:
+        rungs.append(f)
+        f //= eta
+    return sorted(rungs) or [n_folds]
+
+
+# ===================== SUCCESSIVE HALVING =====================
+def successive_halving(kind, candidates, aircraft, executor, eta, min_folds, latency_weight):
+    rungs = fold_schedule(len(aircraft), eta, min_folds)
+    alive = [{"id": i, "params": p} for i, p in enumerate(candidates)]
+    history = []
+    # (candidate id, aircraft) -> fold result; survivors are only fitted on
+    # the folds a rung adds, earlier folds are reused
+    fold_results = {}
+
+    for rung, n_folds in enumerate(rungs):
+        folds = aircraft[:n_folds]
+        futures = {
+            (c["id"], group): executor.submit(evaluate_fold, kind, c["params"], group)
+            for c in alive for group in folds if (c["id"], group) not in fold_results
+        }
+        for key, fut in futures.items():
+            fold_results[key] = fut.result()
+        for c in alive:
+            c.update(combine_folds([fold_results[(c["id"], group)] for group in folds]))
+            c["objective"] = objective(c, latency_weight)
+            c["rung"] = rung
+            history.append(dict(c))
+
+        print(f"rung {rung}: {len(alive)} candidates on {n_folds} fold(s), "
+              f"{len(futures)} fit(s), best F1 {max(c['f1'] for c in alive):.4f}")
+
+        if rung < len(rungs) - 1:
+            ranked = sorted(alive, key=lambda c: c["objective"], reverse=True)
+            keep = {c["id"] for c in ranked[:max(1, len(alive) // eta)]}
+            # non-dominated settings stay too, so the final front shows the trade-off
+            keep |= {c["id"] for c in pareto_front(alive)}
+            alive = [c for c in ranked if c["id"] in keep]
+
+    return alive, history
+
+
+# ===================== HOLD-OUT CHECK =====================
+def holdout_evaluate(kind, params, df, le, features):
+    """Refit on all training aircraft and score on the hold-out aircraft."""
+    train_df = df[df["Aircraft_ID"].isin(TRAIN_AIRCRAFT)]
+    test_df = df[df["Aircraft_ID"].isin(TEST_AIRCRAFT)]
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(build_features(train_df, features))
+    X_test = scaler.transform(build_features(test_df, features))
+    y_train = le.transform(train_df["Health"])
+    y_test = le.transform(test_df["Health"])
+
+    # early stopping must not see the hold-out
+    fit_on = early_stopping_split(kind, train_df["Aircraft_ID"].to_numpy())
+    model = fit_model(kind, params, X_train[fit_on], y_train[fit_on], X_train[~fit_on], y_train[~fit_on])
+
+    return {
+        "holdout_f1": float(f1_score(y_test, model.predict(X_test), average="macro")),
+        "holdout_latency_ms": single_row_latency_ms(model, X_test),
+    }
+
+
+# ===================== MAIN =====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grouped CV hyperparameter search")
+    parser.add_argument("--model", choices=sorted(SEARCH_SPACE), default="rf")
+    parser.add_argument("--candidates", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--eta", type=int, default=2, help="halving rate")
+    parser.add_argument("--min-folds", type=int, default=1, help="folds in the first rung")
+    parser.add_argument("--latency-weight", type=float, default=0.01,
+                        help="F1 points traded per millisecond of single-row latency")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", default=os.path.join(BASE_DIR, "search_report.json"))
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(DATASET_FILE)
+    train_df = df[df["Aircraft_ID"].isin(TRAIN_AIRCRAFT)]
+
+    features = build_features(df).columns.tolist()
+    le = LabelEncoder().fit(df["Health"])
+    X = build_features(train_df, features).to_numpy(dtype=np.float64)
+    y = le.transform(train_df["Health"])
+    groups = train_df["Aircraft_ID"].to_numpy()
+
+    candidates = list(ParameterSampler(SEARCH_SPACE[args.model], args.candidates, random_state=args.seed))
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(X, y, groups)) as executor:
+        finalists, history = successive_halving(
+            args.model, candidates, list(TRAIN_AIRCRAFT), executor,
+            args.eta, args.min_folds, args.latency_weight,
+        )
+    elapsed = time.perf_counter() - t0
+
+    # all candidates that reached the last rung, measured on the same folds
+    last_rung = max(h["rung"] for h in history)
+    final = [h for h in history if h["rung"] == last_rung]
+    front = pareto_front(final)
+
+    # latency measured serially here, without pool contention
+    for r in front:
+        r.update(holdout_evaluate(args.model, r["params"], df, le, features))
+
+    ranked = sorted(final, key=lambda r: r["objective"], reverse=True)
+    report = {
+        "model": args.model,
+        "candidates": len(candidates),
+        "workers": args.workers,
+        "eta": args.eta,
+        "latency_weight": args.latency_weight,
+        "elapsed_s": round(elapsed, 2),
+        "best": ranked[0],
+        "pareto_front": front,
+        "history": history,
+    }
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+
+    print("\n=== Pareto front (F1 vs single-row latency) ===")
+    for r in front:
+        print(f"F1 {r['f1']:.4f}  hold-out F1 {r['holdout_f1']:.4f}  "
+              f"{r['holdout_latency_ms']:.2f} ms  trees {r['trees']}  {r['params']}")
+    print(f"\nBest by objective: {ranked[0]['params']}")
+    print("Report written to", args.report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
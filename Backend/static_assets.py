@@ -0,0 +1,178 @@
+"""In-memory, precompressed serving of the Frontend bundle.
+
+At startup (and whenever a file changes on disk) the whole Frontend tree is
+read into memory. For every file we keep:
+
+  * the bytes, plus gzip and (if the optional brotli package is installed)
+    brotli variants for text assets, each built once at load time,
+  * a content hash used for the ETag (one per encoding) and as a version tag.
+
+Local references in HTML (src/href) and CSS (url(...)) are rewritten to
+"path?v=<hash>". A request carrying the current hash is served with a
+one-year immutable Cache-Control; anything else (HTML pages, unversioned
+URLs) gets "no-cache" so the browser revalidates and gets a cheap 304.
+"""
+
+import os
+import re
+import gzip
+import time
+import hashlib
+import mimetypes
+import posixpath
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+HTML_REF = re.compile(r'''((?:src|href)\s*=\s*["'])([^"'#?:]+)(["'])''')
+CSS_REF = re.compile(r'''(url\(\s*["']?)([^"')#?:]+)(["']?\s*\))''')
+
+
+def content_type(path):
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if mime.startswith("text/") or mime == "application/javascript":
+        mime += "; charset=utf-8"
+    return mime
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def build_asset(path, data):
+    mime = content_type(path)
+    tag = digest(data)
+    variants = {"identity": data}
+    if mime.startswith(COMPRESSIBLE):
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(gz) < len(data):
+            variants["gzip"] = gz
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            if len(br) < len(data):
+                variants["br"] = br
+    return {"type": mime, "hash": tag, "variants": variants}
+
+
+class AssetCache:
+    def __init__(self, root, fallback="login.html"):
+        self.root = root
+        self.fallback = fallback
+        self.lock = threading.Lock()
+        self.assets = {}
+        self.mtimes = {}
+        self.reload()
+
+    # ---------------- loading ----------------
+    def scan(self):
+        """Relative path -> mtime for every file under root."""
+        found = {}
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, self.root).replace(os.sep, "/")
+                found[rel] = os.path.getmtime(full)
+        return found
+
+    def reload(self):
+        mtimes = self.scan()
+        raw = {}
+        for rel in mtimes:
+            with open(os.path.join(self.root, rel), "rb") as f:
+                raw[rel] = f.read()
+
+        # plain assets first, then CSS (refers to images), then HTML (refers to both)
+        assets = {}
+        order = sorted(raw, key=lambda p: (p.endswith(".html"), p.endswith(".css")))
+        for rel in order:
+            data = raw[rel]
+            if rel.endswith(".css"):
+                data = self.versioned(rel, data, CSS_REF, assets)
+            elif rel.endswith(".html"):
+                data = self.versioned(rel, data, HTML_REF, assets)
+            assets[rel] = build_asset(rel, data)
+
+        # swap the whole table at once; requests never see a partial reload
+        self.assets = assets
+        self.mtimes = mtimes
+
+    def versioned(self, rel, data, pattern, assets):
+        """Append ?v=<hash> to references to already-loaded non-HTML assets."""
+        base = posixpath.dirname(rel)
+
+        def rewrite(m):
+            target = posixpath.normpath(posixpath.join(base, m.group(2)))
+            asset = assets.get(target)
+            # pages are navigated to by their plain URL and always revalidated
+            if asset is None or target.endswith(".html"):
+                return m.group(0)
+            return f"{m.group(1)}{m.group(2)}?v={asset['hash']}{m.group(3)}"
+
+        return pattern.sub(rewrite, data.decode("utf-8")).encode("utf-8")
+
+    def changed(self):
+        return self.scan() != self.mtimes
+
+    def watch(self, interval):
+        """Poll the tree and reload when a file is added, removed or modified."""
+        while True:
+            time.sleep(interval)
+            try:
+                if self.changed():
+                    with self.lock:
+                        self.reload()
+                    print("Frontend assets reloaded")
+            except Exception as e:
+                print("Asset reload warning:", e)
+
+    # ---------------- serving ----------------
+    def lookup(self, path):
+        """(asset, is_fallback) for a request path; unknown paths get the fallback page."""
+        assets = self.assets
+        asset = assets.get(path)
+        if asset is not None:
+            return asset, False
+        return assets.get(self.fallback), True
+
+    @staticmethod
+    def negotiate(asset, accept_encoding):
+        accepted = set()
+        for part in (accept_encoding or "").split(","):
+            name, _, param = part.partition(";")
+            param = param.strip()
+            # "gzip;q=0" explicitly refuses the encoding
+            if param.startswith("q=") and param[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+                continue
+            accepted.add(name.strip())
+        for encoding in ("br", "gzip"):
+            if encoding in asset["variants"] and encoding in accepted:
+                return encoding
+        return "identity"
+
+    def respond(self, path, version, accept_encoding, if_none_match):
+        """Return (status, body, headers) for a GET of path."""
+        asset, is_fallback = self.lookup(path)
+        if asset is None:
+            return 404, b"", {}
+
+        encoding = self.negotiate(asset, accept_encoding)
+        etag = f'"{asset["hash"]}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": IMMUTABLE if (version == asset["hash"] and not is_fallback) else REVALIDATE,
+        }
+        if if_none_match and etag in if_none_match:
+            return 304, b"", headers
+
+        headers["Content-Type"] = asset["type"]
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return 200, asset["variants"][encoding], headers
@@ -1,4 +1,6 @@
+import os
 import numpy as np
+import pandas as pd
 from datetime import datetime
 
 np.random.seed(42)
@@ -6,6 +8,60 @@ np.random.seed(42)
 PHASES = ["IDLE", "TAKEOFF", "CRUISE", "DESCENT"]
 PHASE_WEIGHTS = [0.25, 0.15, 0.45, 0.15]
 
+# Aircraft-wise split shared by the training scripts and incremental updates
+TRAIN_AIRCRAFT = ["HAL-HJT-01", "HAL-HJT-02", "HAL-HJT-03", "HAL-HJT-04"]
+TEST_AIRCRAFT = ["HAL-HJT-05", "HAL-HJT-06"]
+# copies of an aircraft (loadgen.py, memory_report.py) are named HAL-HJT-xx-k
+TEST_AIRCRAFT_PATTERN = r"^(?:%s)(?:-\d+)?$" % "|".join(TEST_AIRCRAFT)
+
+# Columns never used as model inputs (Severity is latent ground truth)
+DROP_COLS = ["Timestamp", "Aircraft_ID", "Engine_Model", "Health", "Severity"]
+
+
+# Model artifacts per type, shared by the trainers, incremental.py and app.py
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.path.join(BASE_DIR, "savedmodels")
+MODEL_ARTIFACTS = {
+    "rf": {
+        "model": "rf_engine_health_model.pkl",
+        "scaler": "scaler.pkl",
+        "le": "label_encoder.pkl",
+        "features": "model_features.pkl",
+    },
+    "xgb": {
+        "model": "xg_engine_health_model.pkl",
+        "scaler": "xg_scaler.pkl",
+        "le": "xg_label_encoder.pkl",
+        "features": "xg_model_features.pkl",
+    },
+}
+
+
+def resolve_path(p):
+    # try absolute / relative to BASE_DIR / savedmodels folder
+    if not p:
+        return None
+    if os.path.isabs(p) and os.path.exists(p):
+        return p
+    candidate = os.path.join(BASE_DIR, p)
+    if os.path.exists(candidate):
+        return candidate
+    # try savedmodels subfolder
+    candidate2 = os.path.join(MODELS_DIR, os.path.basename(p))
+    if os.path.exists(candidate2):
+        return candidate2
+    return None
+
+
+def artifact_path(name):
+    """Where an artifact is read from, or written to when it does not exist yet."""
+    return resolve_path(name) or os.path.join(MODELS_DIR, name)
+
+
+def is_test_aircraft(aircraft_ids):
+    """Boolean mask of rows from hold-out aircraft or copies of them."""
+    return pd.Series(aircraft_ids).astype(str).str.match(TEST_AIRCRAFT_PATTERN)
+
 
 def add_noise(x, pct):
     return x + np.random.normal(0, abs(x) * pct)
@@ -29,13 +85,14 @@ def severity_from_health(health):
         return np.random.uniform(0.7, 1.0)
 
 
-def generate_sample(aircraft_id="HAL-HJT-01", live=False):
+def generate_sample(aircraft_id="HAL-HJT-01", live=False, labeled=False):
     """Generate a single synthetic sensor sample dict similar to training data.
 
     Args:
         aircraft_id: aircraft identifier
         live: when True, use a lower probability of WARNING/CRITICAL to better
               reflect live operation while still occasionally producing anomalies.
+        labeled: when True, include the Health state the sensors were drawn from.
     """
     base_rpm = np.random.uniform(3000, 3300)
     base_egt = np.random.uniform(500, 530)
@@ -83,4 +140,29 @@ def generate_sample(aircraft_id="HAL-HJT-01", live=False):
         "OilPressure": round(oil_p, 1),
         "Vibration": round(vib, 2),
     }
+    if labeled:
+        sample["Health"] = health
     return sample
+
+
+def build_features(df, model_features=None):
+    """Turn raw readings into the model input frame.
+
+    Drops non-feature columns, one-hot encodes Phase and, when
+    model_features is given, aligns the columns to it (missing ones are 0).
+    """
+    X = df.drop(columns=[c for c in DROP_COLS if c in df.columns])
+    if "Phase" in X.columns:
+        X = pd.get_dummies(X, columns=["Phase"])
+    if model_features is not None:
+        X = X.reindex(columns=model_features, fill_value=0)
+    return X
+
+
+def scaler_input(scaler, X):
+    """Pass X the way the scaler was fitted.
+
+    Scalers from the original scripts were fitted on DataFrames (with feature
+    names); those fitted through dataset.py saw plain float32 arrays.
+    """
+    return X if hasattr(scaler, "feature_names_in_") else X.to_numpy(dtype=np.float64)
@@ -454,6 +454,71 @@ if (document.getElementById('rpmChart')) {
   // Poll every 60 seconds (1 minute) for data updates
   poll();
   setInterval(poll, 60000);
+
+  // Fleet overview: the server answers unchanged summaries with 304 (ETag),
+  // which the browser turns back into the cached body
+  const fleetBox = document.getElementById('fleetSummary');
+
+  function formatAge(ts) {
+    if (!ts) return 'never';
+    const mins = Math.round((Date.now() / 1000 - ts) / 60);
+    return mins < 60 ? `${mins} min ago` : `${(mins / 60).toFixed(1)} h ago`;
+  }
+
+  function fleetHeading(text) {
+    const h = document.createElement('h4');
+    h.textContent = text;
+    return h;
+  }
+
+  function fleetTable(headers, rows) {
+    const table = document.createElement('table');
+    [headers, ...rows].forEach((values, i) => {
+      const tr = table.insertRow();
+      values.forEach(v => {
+        const cell = document.createElement(i === 0 ? 'th' : 'td');
+        cell.textContent = v ?? '';
+        tr.appendChild(cell);
+      });
+    });
+    return table;
+  }
+
+  async function pollFleet() {
+    try {
+      const res = await fetch(API + '/fleet/summary', { credentials: 'include' });
+      if (!res.ok) return;
+      const f = await res.json();
+
+      // aircraft IDs and phases come from request bodies: set as text, never as HTML
+      const summary = document.createElement('div');
+      summary.append(`${f.aircraft} aircraft \u2014 `);
+      Object.entries(f.health_counts).forEach(([k, v], i) => {
+        const count = document.createElement('strong');
+        count.textContent = v;
+        summary.append(i ? ' | ' : '', `${k}: `, count);
+      });
+
+      const worst = f.worst_engines.map(e => [
+        e.aircraft_id, e.health, e.phase, `${(e.risk * 100).toFixed(1)}%`, formatAge(e.last_anomaly_at)
+      ]);
+      const phases = Object.entries(f.phase_averages)
+        .map(([p, a]) => [p, a.RPM, a.EGT, a.Vibration, a.OilPressure]);
+
+      fleetBox.replaceChildren(
+        summary,
+        fleetHeading('Worst engines'),
+        fleetTable(['Aircraft', 'Health', 'Phase', 'Risk', 'Last anomaly'], worst),
+        fleetHeading('Per-phase averages'),
+        fleetTable(['Phase', 'RPM', 'EGT', 'Vibration', 'Oil Pressure'], phases)
+      );
+    } catch (e) {
+      console.error("Fleet poll error:", e);
+    }
+  }
+
+  pollFleet();
+  setInterval(pollFleet, 60000);
 }
 
 // PREDICTION page